@@ -6,17 +6,25 @@ if sys.version_info >= (3, 9):
     from importlib.resources import files  # type: ignore
 else:
     from importlib.resources import path
-from .renderdoc_api import RENDERDOC_API_1_6_0
+from .renderdoc_api import (RENDERDOC_API_1_0_0, RENDERDOC_API_1_0_1, RENDERDOC_API_1_0_2, RENDERDOC_API_1_1_0,
+                            RENDERDOC_API_1_1_1, RENDERDOC_API_1_1_2, RENDERDOC_API_1_2_0, RENDERDOC_API_1_3_0,
+                            RENDERDOC_API_1_4_0, RENDERDOC_API_1_4_1, RENDERDOC_API_1_4_2, RENDERDOC_API_1_5_0,
+                            RENDERDOC_API_1_6_0, RENDERDOC_API_CLASSES, get_render_doc_api)
+from .renderdoc_enums import RENDERDOC_Version
 from typing import Optional
 
 
-def load_render_doc(renderdoc_path: Optional[str] = None) -> RENDERDOC_API_1_6_0:
+def load_render_doc(renderdoc_path: Optional[str] = None,
+                    min_version: RENDERDOC_Version = RENDERDOC_Version.eRENDERDOC_API_Version_1_0_0) \
+        -> RENDERDOC_API_1_0_0:
     """
-    Loads the Renderdoc in-app library.
+    Loads the Renderdoc in-app library, and gets the highest API version it supports.
 
     :param renderdoc_path: optionally, a path to a local copy of the Renderdoc library. Must be compatible with the
                            current platform.
-    :return: the loaded instance of the Renderdoc API.
+    :param min_version: the oldest API version which is acceptable.
+    :return: the loaded instance of the Renderdoc API. Functions added after API v1.0.0 are only available if the
+             library supports them, check the type or ``version`` of the returned API before calling them.
     """
     if renderdoc_path is None:
         if sys.platform.startswith("win32"):
@@ -46,4 +54,35 @@ def load_render_doc(renderdoc_path: Optional[str] = None) -> RENDERDOC_API_1_6_0
         lib_path = renderdoc_path
 
     rd = CDLL(lib_path)
-    return RENDERDOC_API_1_6_0(rd)
+    return get_render_doc_api(rd, min_version)
+
+
+_worker_api: Optional[RENDERDOC_API_1_0_0] = None
+
+
+def init_render_doc_worker(renderdoc_path: Optional[str] = None) -> None:
+    """
+    Loads the Renderdoc in-app library once in a worker process. Intended to be used as the ``initializer`` of a
+    ``multiprocessing.Pool`` or ``concurrent.futures.ProcessPoolExecutor``, tasks can then get the loaded API with
+    :func:`get_worker_render_doc`.
+
+    *Example:*
+        ``ProcessPoolExecutor(initializer=init_render_doc_worker, initargs=(renderdoc_path,))``
+
+    :param renderdoc_path: optionally, a path to a local copy of the Renderdoc library. Must be compatible with the
+                           current platform.
+    """
+    global _worker_api
+    _worker_api = load_render_doc(renderdoc_path)
+
+
+def get_worker_render_doc() -> RENDERDOC_API_1_0_0:
+    """
+    Gets the Renderdoc API loaded in this worker process by :func:`init_render_doc_worker`.
+
+    :return: the loaded instance of the Renderdoc API.
+    """
+    if _worker_api is None:
+        raise RuntimeError("Renderdoc hasn't been loaded in this worker, use init_render_doc_worker() as the pool "
+                           "initializer!")
+    return _worker_api
@@ -0,0 +1,34 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import argparse
+import json
+import sys
+
+from .batch_capture import load_manifest, run_batch
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m pyRenderdocApp",
+                                     description="Captures frames from many target scripts in parallel.")
+    parser.add_argument("manifest", help="the JSON manifest listing the target scripts and frames to capture")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="the maximum number of worker processes (default: the number of CPUs)")
+    parser.add_argument("-o", "--output", default=None, help="where to write the JSON summary (default: stdout)")
+    parser.add_argument("--output-dir", default=None, help="overrides the manifest's capture output directory")
+    parser.add_argument("--renderdoc-path", default=None, help="a path to a local copy of the Renderdoc library")
+    args = parser.parse_args()
+
+    jobs = load_manifest(args.manifest, args.output_dir)
+    summary = run_batch(jobs, args.jobs, args.renderdoc_path)
+    if args.output is None:
+        json.dump(summary, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary["failed"] > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+# Ported from renderdoc_app.h, available under the MIT license Copyright (c) 2019-2023 Baldur Karlsson
+# https://github.com/baldurk/renderdoc/blob/v1.x/renderdoc/api/app/renderdoc_app.h
+
+from ctypes import *
+from typing import Any, Dict, Tuple
+
+from .renderdoc_enums import RENDERDOC_Version
+
+_V = RENDERDOC_Version
+
+API_FUNCTIONS: Tuple[Tuple[str, RENDERDOC_Version, Any, Tuple[Any, ...]], ...] = (
+    # (name, version the function was added in, return type, argument types), in function table order
+    ("GetAPIVersion", _V.eRENDERDOC_API_Version_1_0_0, None, (POINTER(c_int), POINTER(c_int), POINTER(c_int))),
+
+    ("SetCaptureOptionU32", _V.eRENDERDOC_API_Version_1_0_0, c_int, (c_int, c_uint32)),
+    ("SetCaptureOptionF32", _V.eRENDERDOC_API_Version_1_0_0, c_int, (c_int, c_float)),
+
+    ("GetCaptureOptionU32", _V.eRENDERDOC_API_Version_1_0_0, c_uint32, (c_int,)),
+    ("GetCaptureOptionF32", _V.eRENDERDOC_API_Version_1_0_0, c_float, (c_int,)),
+
+    ("SetFocusToggleKeys", _V.eRENDERDOC_API_Version_1_0_0, None, (POINTER(c_int), c_int)),
+    ("SetCaptureKeys", _V.eRENDERDOC_API_Version_1_0_0, None, (POINTER(c_int), c_int)),
+
+    ("GetOverlayBits", _V.eRENDERDOC_API_Version_1_0_0, c_uint32, ()),
+    ("MaskOverlayBits", _V.eRENDERDOC_API_Version_1_0_0, None, (c_uint32, c_uint32)),
+
+    # Named Shutdown before 1.4.1
+    ("RemoveHooks", _V.eRENDERDOC_API_Version_1_0_0, None, ()),
+    ("UnloadCrashHandler", _V.eRENDERDOC_API_Version_1_0_0, None, ()),
+
+    # Named SetLogFilePathTemplate and GetLogFilePathTemplate before 1.1.2
+    ("SetCaptureFilePathTemplate", _V.eRENDERDOC_API_Version_1_0_0, None, (c_char_p,)),
+    ("GetCaptureFilePathTemplate", _V.eRENDERDOC_API_Version_1_0_0, c_char_p, ()),
+
+    ("GetNumCaptures", _V.eRENDERDOC_API_Version_1_0_0, c_uint32, ()),
+    ("GetCapture", _V.eRENDERDOC_API_Version_1_0_0, c_uint32,
+     (c_uint32, c_char_p, POINTER(c_uint32), POINTER(c_uint64))),
+
+    ("TriggerCapture", _V.eRENDERDOC_API_Version_1_0_0, None, ()),
+
+    # Named IsRemoteAccessConnected before 1.1.1
+    ("IsTargetControlConnected", _V.eRENDERDOC_API_Version_1_0_0, c_uint32, ()),
+    ("LaunchReplayUI", _V.eRENDERDOC_API_Version_1_0_0, c_uint32, (c_uint32, c_char_p)),
+
+    ("SetActiveWindow", _V.eRENDERDOC_API_Version_1_0_0, None, (c_void_p, c_void_p)),
+
+    ("StartFrameCapture", _V.eRENDERDOC_API_Version_1_0_0, None, (c_void_p, c_void_p)),
+    ("IsFrameCapturing", _V.eRENDERDOC_API_Version_1_0_0, c_uint32, ()),
+    ("EndFrameCapture", _V.eRENDERDOC_API_Version_1_0_0, c_uint32, (c_void_p, c_void_p)),
+
+    ("TriggerMultiFrameCapture", _V.eRENDERDOC_API_Version_1_1_0, None, (c_uint32,)),
+
+    ("SetCaptureFileComments", _V.eRENDERDOC_API_Version_1_2_0, None, (c_char_p, c_char_p)),
+
+    ("DiscardFrameCapture", _V.eRENDERDOC_API_Version_1_4_0, c_uint32, (c_void_p, c_void_p)),
+
+    ("ShowReplayUI", _V.eRENDERDOC_API_Version_1_5_0, c_uint32, ()),
+
+    ("SetCaptureTitle", _V.eRENDERDOC_API_Version_1_6_0, None, (c_char_p,)),
+)
+"""The functions in the RenderDoc API function table, in the order they appear in ``RENDERDOC_API_1_6_0``."""
+
+API_PROTOTYPES: Tuple[Tuple[str, Any], ...] = tuple(("_" + name, CFUNCTYPE(restype, *argtypes))
+                                                    for name, _, restype, argtypes in API_FUNCTIONS)
+"""The attribute name and ``CFUNCTYPE`` prototype of each function in :data:`API_FUNCTIONS`, built once on import."""
+
+API_FUNCTION_COUNTS: Dict[RENDERDOC_Version, int] = {
+    version: sum(1 for _, added, _, _ in API_FUNCTIONS if added.value <= version.value)
+    for version in RENDERDOC_Version
+}
+"""The number of functions in the function table of each API version."""
@@ -0,0 +1,186 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import json
+import multiprocessing
+import os
+import runpy
+import sys
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from . import init_render_doc_worker, get_worker_render_doc
+
+
+class CaptureJob(NamedTuple):
+    """
+    A single target script to capture, as described in a batch manifest.
+
+    The target script is run once per job and must define a ``render_frame(frame: int)`` function which renders a
+    single frame. It may also define ``setup(args: List[str])``, called before the first frame, and ``teardown()``,
+    called after the last frame.
+    """
+    name: str
+    """The name of the job, used to name its captures."""
+    script: str
+    """The path to the target script."""
+    first_frame: int
+    """The first frame to capture, frames before this are rendered without capturing."""
+    last_frame: int
+    """The last frame to capture (inclusive)."""
+    args: List[str]
+    """Arguments passed to the script's ``setup()`` function."""
+    output_dir: str
+    """The directory to write the job's captures to."""
+
+
+def load_manifest(path: str, output_dir: Optional[str] = None) -> List[CaptureJob]:
+    """
+    Loads a batch capture manifest.
+
+    The manifest is a JSON object of the form::
+
+        {
+            "output_dir": "captures",
+            "jobs": [
+                {"name": "forest", "script": "scenes/forest.py", "frames": [10, 12], "args": ["--hdr"]}
+            ]
+        }
+
+    ``frames`` is an inclusive range of frames to capture, a single number captures just that frame. Relative paths
+    are resolved against the directory containing the manifest.
+
+    :param path: the path to the manifest.
+    :param output_dir: overrides the manifest's output directory.
+    :return: the jobs in the manifest.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    if output_dir is None:
+        output_dir = os.path.join(base_dir, manifest.get("output_dir", "captures"))
+
+    jobs = []
+    for i, job in enumerate(manifest["jobs"]):
+        if "script" not in job:
+            raise ValueError(f"Job {i} in '{path}' has no script!")
+        frames = job.get("frames", 0)
+        if isinstance(frames, int):
+            frames = [frames, frames]
+        if len(frames) != 2 or frames[0] < 0 or frames[1] < frames[0]:
+            raise ValueError(f"Job {i} in '{path}' has an invalid frame range: {frames}")
+        name = job.get("name", os.path.splitext(os.path.basename(job["script"]))[0])
+        jobs.append(CaptureJob(name, os.path.join(base_dir, job["script"]), frames[0], frames[1],
+                               [str(a) for a in job.get("args", [])], os.path.abspath(output_dir)))
+    return jobs
+
+
+def run_capture_job(job: CaptureJob) -> Dict[str, Any]:
+    """
+    Runs a single capture job in the current process. RenderDoc must already have been loaded with
+    :func:`pyRenderdocApp.init_render_doc_worker`.
+
+    The script's output is redirected to stderr so that it doesn't mix with the batch summary.
+
+    :param job: the job to run.
+    :return: a JSON serialisable summary of the job.
+    """
+    with redirect_stdout(sys.stderr):
+        return _run_capture_job(job)
+
+
+def _job_result(job: CaptureJob) -> Dict[str, Any]:
+    return {"name": job.name, "script": job.script, "frames": [job.first_frame, job.last_frame],
+            "captures": [], "frame_times": [], "setup_time": None, "error": None}
+
+
+def _run_capture_job(job: CaptureJob) -> Dict[str, Any]:
+    start = time.perf_counter()
+    result = _job_result(job)
+    try:
+        rd = get_worker_render_doc()
+        rd.set_capture_file_path_template(os.path.join(job.output_dir, job.name, job.name))
+        first_capture = rd.get_num_captures()
+
+        script = runpy.run_path(job.script, run_name="__pyrenderdocapp__")
+        render_frame = script["render_frame"]
+        setup_start = time.perf_counter()
+        try:
+            if "setup" in script:
+                script["setup"](job.args)
+        finally:
+            result["setup_time"] = time.perf_counter() - setup_start
+
+        try:
+            for frame in range(job.last_frame + 1):
+                if frame < job.first_frame:
+                    render_frame(frame)
+                    continue
+                frame_start = time.perf_counter()
+                rd.start_frame_capture(None, None)
+                try:
+                    render_frame(frame)
+                finally:
+                    rd.end_frame_capture(None, None)
+                result["frame_times"].append(time.perf_counter() - frame_start)
+        finally:
+            if "teardown" in script:
+                script["teardown"]()
+
+        for i in range(first_capture, rd.get_num_captures()):
+            valid, path, _, timestamp = rd.get_capture(i)
+            if valid:
+                result["captures"].append({"path": path, "timestamp": timestamp.isoformat(),
+                                           "size": os.path.getsize(path) if os.path.exists(path) else None})
+    except BaseException:
+        # Target scripts can call sys.exit(), which mustn't take down the worker or lose the batch summary
+        result["error"] = traceback.format_exc()
+    result["total_time"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(jobs: List[CaptureJob], max_workers: Optional[int] = None,
+              renderdoc_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Runs capture jobs in a bounded pool of worker processes. Each worker loads RenderDoc once, before running any
+    target scripts, so that it's loaded before the scripts initialise their graphics APIs.
+
+    If a worker dies (eg: RenderDoc couldn't be loaded, or a target script crashed the interpreter) or a job's result
+    can't be sent back, the jobs affected are marked as failed, the summary is still returned.
+
+    :param jobs: the jobs to run.
+    :param max_workers: the maximum number of worker processes, defaults to the number of CPUs.
+    :param renderdoc_path: optionally, a path to a local copy of the Renderdoc library.
+    :return: a JSON serialisable summary of the batch.
+    """
+    start = time.perf_counter()
+    # Workers are spawned rather than forked so that they never inherit a graphics context from the parent
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                             initializer=init_render_doc_worker, initargs=(renderdoc_path,)) as executor:
+        futures: List[Future] = []
+        for job in jobs:
+            try:
+                future = executor.submit(run_capture_job, job)
+            except BrokenProcessPool as e:
+                future = Future()
+                future.set_exception(e)
+            futures.append(future)
+        results = []
+        for job, future in zip(jobs, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                result = _job_result(job)
+                result["error"] = f"{type(e).__name__}: {e}"
+                results.append(result)
+    return {
+        "jobs": results,
+        "succeeded": sum(1 for r in results if r["error"] is None),
+        "failed": sum(1 for r in results if r["error"] is not None),
+        "total_time": time.perf_counter() - start,
+    }
@@ -0,0 +1,187 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import math
+import os
+import struct
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .renderdoc_enums import RENDERDOC_CaptureOption
+
+TRACKED_OPTIONS: Tuple[RENDERDOC_CaptureOption, ...] = (
+    RENDERDOC_CaptureOption.eRENDERDOC_Option_APIValidation,
+    RENDERDOC_CaptureOption.eRENDERDOC_Option_CaptureCallstacks,
+    RENDERDOC_CaptureOption.eRENDERDOC_Option_CaptureCallstacksOnlyActions,
+    RENDERDOC_CaptureOption.eRENDERDOC_Option_VerifyBufferAccess,
+    RENDERDOC_CaptureOption.eRENDERDOC_Option_HookIntoChildren,
+    RENDERDOC_CaptureOption.eRENDERDOC_Option_RefAllResources,
+    RENDERDOC_CaptureOption.eRENDERDOC_Option_SaveAllInitials,
+    RENDERDOC_CaptureOption.eRENDERDOC_Option_CaptureAllCmdLists,
+)
+"""The capture options which affect the cost of a capture. Each distinct combination of these is a profile."""
+
+_FILE_HEADER = struct.Struct("<4sI")
+_FILE_MAGIC = b"RDCH"
+_FILE_VERSION = 1
+_RECORD = struct.Struct("<dIfQ")
+
+
+class CaptureCost(NamedTuple):
+    """
+    The estimated cost of a capture.
+    """
+    stall_seconds: float
+    """The mean time spent in ``end_frame_capture``."""
+    stall_seconds_stddev: float
+    """The standard deviation of the time spent in ``end_frame_capture``."""
+    size_bytes: float
+    """The mean size of the capture file."""
+    size_bytes_stddev: float
+    """The standard deviation of the size of the capture file."""
+    samples: int
+    """The number of captures the estimate is based on."""
+    exact: bool
+    """``False`` if no captures were recorded with this profile and the closest recorded profile was used instead."""
+
+
+class _ProfileStats:
+    """
+    Running mean and variance of the stall time and size of the captures made with a single profile.
+    """
+    __slots__ = ("count", "stall_mean", "stall_m2", "size_mean", "size_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.stall_mean = 0.0
+        self.stall_m2 = 0.0
+        self.size_mean = 0.0
+        self.size_m2 = 0.0
+
+    def add(self, stall: float, size: int) -> None:
+        # Welford's online algorithm
+        self.count += 1
+        delta = stall - self.stall_mean
+        self.stall_mean += delta / self.count
+        self.stall_m2 += delta * (stall - self.stall_mean)
+        delta = size - self.size_mean
+        self.size_mean += delta / self.count
+        self.size_m2 += delta * (size - self.size_mean)
+
+    def cost(self, exact: bool) -> CaptureCost:
+        n = max(self.count - 1, 1)
+        return CaptureCost(self.stall_mean, math.sqrt(self.stall_m2 / n),
+                           self.size_mean, math.sqrt(self.size_m2 / n), self.count, exact)
+
+
+def capture_profile(options: Dict[RENDERDOC_CaptureOption, int]) -> int:
+    """
+    Gets the profile of a set of capture options, a bitmask of which :data:`TRACKED_OPTIONS` are enabled.
+
+    :param options: the values of the capture options, missing options are treated as disabled.
+    :return: the profile.
+    """
+    profile = 0
+    for i, option in enumerate(TRACKED_OPTIONS):
+        if options.get(option, 0) != 0:
+            profile |= 1 << i
+    return profile
+
+
+class CaptureHistory:
+    """
+    A compact, append-only history of the captures made by this package, used to estimate the cost of future
+    captures.
+
+    For every capture the profile of the active capture options, the time spent in ``end_frame_capture`` and the
+    size of the capture file are recorded in a fixed-size binary record. A running mean and variance of the stall
+    time and size is kept for each profile.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: the path of the history file, created if it doesn't exist.
+        """
+        self.path = path
+        self._profiles: Dict[int, _ProfileStats] = {}
+        self._lock = threading.Lock()
+        self._created = False
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if len(data) < _FILE_HEADER.size:
+            return
+        magic, version = _FILE_HEADER.unpack_from(data)
+        if magic != _FILE_MAGIC or version != _FILE_VERSION:
+            raise ValueError(f"'{self.path}' is not a capture history file!")
+        end = _FILE_HEADER.size + (len(data) - _FILE_HEADER.size) // _RECORD.size * _RECORD.size
+        for _, profile, stall, size in _RECORD.iter_unpack(memoryview(data)[_FILE_HEADER.size:end]):
+            self._add(profile, stall, size)
+
+    def _add(self, profile: int, stall: float, size: int) -> None:
+        stats = self._profiles.get(profile)
+        if stats is None:
+            stats = self._profiles[profile] = _ProfileStats()
+        stats.add(stall, size)
+
+    @property
+    def profiles(self) -> List[int]:
+        """
+        The profiles which have been recorded.
+        """
+        with self._lock:
+            return list(self._profiles.keys())
+
+    def _create(self) -> None:
+        # The header is written to any empty file, including one created empty by someone else (eg: mkstemp).
+        # Writers which race here all write the same bytes at the start of the file, before appending any records, so
+        # the header can't be duplicated or land after a record
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o666)
+        try:
+            if os.fstat(fd).st_size == 0:
+                os.write(fd, _FILE_HEADER.pack(_FILE_MAGIC, _FILE_VERSION))
+        finally:
+            os.close(fd)
+        self._created = True
+
+    def record(self, options: Dict[RENDERDOC_CaptureOption, int], stall_seconds: float, size_bytes: int) -> None:
+        """
+        Records a capture in the history.
+
+        :param options: the values of the capture options when the capture was made.
+        :param stall_seconds: the time spent in ``end_frame_capture``.
+        :param size_bytes: the size of the capture file.
+        """
+        profile = capture_profile(options)
+        record = _RECORD.pack(time.time(), profile, stall_seconds, size_bytes)
+        with self._lock:
+            self._add(profile, stall_seconds, size_bytes)
+            if not self._created:
+                self._create()
+            with open(self.path, "ab") as f:
+                f.write(record)
+
+    def estimate_capture_cost(self, options: Dict[RENDERDOC_CaptureOption, int]) -> Optional[CaptureCost]:
+        """
+        Estimates the cost of a capture made with the given capture options.
+
+        If no captures have been recorded with the same profile, the estimate from the closest recorded profile
+        (the one differing in the fewest options) is returned instead, marked as not exact.
+
+        :param options: the values of the capture options, missing options are treated as disabled.
+        :return: the estimated cost, or ``None`` if no captures have been recorded.
+        """
+        profile = capture_profile(options)
+        with self._lock:
+            stats = self._profiles.get(profile)
+            if stats is not None:
+                return stats.cost(True)
+            if len(self._profiles) == 0:
+                return None
+            closest = min(self._profiles.items(), key=lambda p: (bin(p[0] ^ profile).count("1"), -p[1].count))
+            return closest[1].cost(False)
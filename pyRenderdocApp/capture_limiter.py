@@ -0,0 +1,302 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import ctypes
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+import weakref
+from typing import Optional
+
+if sys.platform.startswith("win32"):
+    import msvcrt
+    fcntl = None
+else:
+    import fcntl
+    msvcrt = None
+
+_MAGIC = 0x4D4C4452
+_MAX_SLOTS = 64
+_STATE = struct.Struct("<IIdd")
+_SLOT = struct.Struct("<I")
+_STATE_SIZE = _STATE.size + _SLOT.size * _MAX_SLOTS
+_LOCK_SPINS = 100
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_ERROR_ACCESS_DENIED = 5
+_STILL_ACTIVE = 259
+
+
+_limiters: "weakref.WeakSet[CaptureRateLimiter]" = weakref.WeakSet()
+
+
+def _after_fork() -> None:
+    # A child which keeps using its parent's file description shares the parent's lock, so each limiter is reopened
+    for limiter in list(_limiters):
+        try:
+            limiter._state()
+        except Exception:
+            pass
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def _pid_alive(pid: int) -> bool:
+    if msvcrt is not None:
+        # os.kill() terminates the process on Windows, so ask for its exit code instead
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            # The process exists if we're only denied access to it
+            return ctypes.get_last_error() == _ERROR_ACCESS_DENIED
+        try:
+            exit_code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return True
+            return exit_code.value == _STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class CaptureRateLimiter:
+    """
+    A host-wide limit on captures, shared by every process which uses a limiter with the same name.
+
+    The limiter caps the number of concurrent captures and the rate at which capture data is written to disk using a
+    token bucket of bytes. The state is kept in a small memory-mapped file in the temp directory, guarded by a file
+    lock which is only ever held for a few microseconds. Nothing blocks: if a capture can't be started right now it
+    is simply refused.
+
+    A capture may start as long as the bucket isn't in debt, the size of the capture is charged once it's known, so a
+    large capture delays the next ones until the bucket refills.
+
+    If the shared state can't be created (eg: the temp directory is read-only) the limiter is unavailable and every
+    request is allowed, or refused if ``fail_open`` is ``False``.
+    """
+
+    def __init__(self, name: str = "pyRenderdocApp", max_concurrent: int = 1,
+                 bytes_per_second: Optional[float] = None, burst_bytes: Optional[float] = None,
+                 state_dir: Optional[str] = None, fail_open: bool = True):
+        """
+        :param name: the name of the limiter, processes using the same name share a limit.
+        :param max_concurrent: the maximum number of captures which can be running at once across the host.
+        :param bytes_per_second: the maximum rate at which capture data can be written across the host, or ``None``
+                                 for no limit.
+        :param burst_bytes: the size of the token bucket, defaults to one second's worth of data.
+        :param state_dir: the directory to store the shared state in, defaults to the temp directory.
+        :param fail_open: whether to allow captures when the shared state is unavailable.
+        """
+        self.max_concurrent = min(max(max_concurrent, 1), _MAX_SLOTS)
+        self.bytes_per_second = bytes_per_second
+        self.burst_bytes = burst_bytes if burst_bytes is not None else bytes_per_second
+        self.fail_open = fail_open
+        self.last_capture_bytes = 0
+        """The size of the last capture released by this process, used to estimate the size of triggered captures."""
+        self.path = os.path.join(state_dir or tempfile.gettempdir(), f"{name}.caplimit")
+        self._fd = -1
+        self._mm: Optional[mmap.mmap] = None
+        self._pid = os.getpid()
+        # File locks don't exclude threads which share the file, so threads are excluded separately
+        self._thread_lock = threading.Lock()
+        try:
+            self._open()
+        except OSError:
+            self.close()
+        _limiters.add(self)
+
+    def _open(self) -> None:
+        self._pid = os.getpid()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        if os.fstat(self._fd).st_size < _STATE_SIZE:
+            os.ftruncate(self._fd, _STATE_SIZE)
+        self._mm = mmap.mmap(self._fd, _STATE_SIZE)
+        if not self._lock():
+            return
+        try:
+            if _STATE.unpack_from(self._mm, 0)[0] != _MAGIC:
+                self._mm[:_STATE_SIZE] = bytes(_STATE_SIZE)
+                _STATE.pack_into(self._mm, 0, _MAGIC, 0, self.burst_bytes or 0.0, time.monotonic())
+        finally:
+            self._unlock()
+
+    def close(self) -> None:
+        """
+        Releases the shared state. The limiter is unavailable afterwards.
+        """
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def reopen(self) -> None:
+        """
+        Reopens the shared state. Called automatically in a forked child process.
+        """
+        self.close()
+        try:
+            self._open()
+        except OSError:
+            self.close()
+
+    def _state(self) -> Optional[mmap.mmap]:
+        if self._pid != os.getpid() and self._mm is not None:
+            # File locks belong to the open file description, which a forked child shares with its parent, so the
+            # child must open the file again to be excluded by the parent's lock
+            self._thread_lock = threading.Lock()
+            self.reopen()
+        return self._mm
+
+    @property
+    def available(self) -> bool:
+        """
+        ``True`` if the shared state could be opened.
+        """
+        return self._mm is not None
+
+    def _lock(self) -> bool:
+        self._thread_lock.acquire()
+        for _ in range(_LOCK_SPINS):
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                pass
+        self._thread_lock.release()
+        return False
+
+    def _unlock(self) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            self._thread_lock.release()
+
+    def _refill(self, tokens: float, last: float, now: float) -> float:
+        if self.bytes_per_second is None:
+            return 0.0
+        if now < last:
+            # The clock was reset (eg: after a reboot), start again from a full bucket
+            return float(self.burst_bytes)
+        return min(float(self.burst_bytes), tokens + (now - last) * self.bytes_per_second)
+
+    def try_acquire(self) -> bool:
+        """
+        Tries to start a capture, taking one of the concurrent capture slots. Every successful call must be followed
+        by a call to :meth:`release`.
+
+        :return: ``True`` if the capture may start.
+        """
+        mm = self._state()
+        if mm is None:
+            return self.fail_open
+        if not self._lock():
+            return False
+        try:
+            _, active, tokens, last = _STATE.unpack_from(mm, 0)
+            now = time.monotonic()
+            tokens = self._refill(tokens, last, now)
+            if tokens < 0:
+                _STATE.pack_into(mm, 0, _MAGIC, active, tokens, now)
+                return False
+            if active >= self.max_concurrent:
+                active = self._reap_slots(mm)
+                if active >= self.max_concurrent:
+                    return False
+            pid = os.getpid()
+            for i in range(_MAX_SLOTS):
+                offset = _STATE.size + i * _SLOT.size
+                if _SLOT.unpack_from(mm, offset)[0] == 0:
+                    _SLOT.pack_into(mm, offset, pid)
+                    break
+            _STATE.pack_into(mm, 0, _MAGIC, active + 1, tokens, now)
+            return True
+        finally:
+            self._unlock()
+
+    def _reap_slots(self, mm: mmap.mmap) -> int:
+        # Free the slots of processes which died without releasing them
+        active = 0
+        for i in range(_MAX_SLOTS):
+            offset = _STATE.size + i * _SLOT.size
+            pid = _SLOT.unpack_from(mm, offset)[0]
+            if pid == 0:
+                continue
+            if _pid_alive(pid):
+                active += 1
+            else:
+                _SLOT.pack_into(mm, offset, 0)
+        return active
+
+    def release(self, nbytes: int = 0) -> None:
+        """
+        Ends a capture started with :meth:`try_acquire`, freeing its slot and charging its size to the host's
+        byte rate.
+
+        :param nbytes: the size of the capture written, or 0 if the capture was discarded.
+        """
+        if nbytes > 0:
+            self.last_capture_bytes = nbytes
+        mm = self._state()
+        if mm is None or not self._lock():
+            return
+        try:
+            _, active, tokens, last = _STATE.unpack_from(mm, 0)
+            now = time.monotonic()
+            tokens = self._refill(tokens, last, now) - nbytes
+            pid = os.getpid()
+            for i in range(_MAX_SLOTS):
+                offset = _STATE.size + i * _SLOT.size
+                if _SLOT.unpack_from(mm, offset)[0] == pid:
+                    _SLOT.pack_into(mm, offset, 0)
+                    active = max(active - 1, 0)
+                    break
+            _STATE.pack_into(mm, 0, _MAGIC, active, tokens, now)
+        finally:
+            self._unlock()
+
+    def try_consume(self, nbytes: Optional[int] = None) -> bool:
+        """
+        Charges a capture to the host's byte rate without taking a concurrent capture slot. Used for captures whose
+        end can't be observed, such as those started by ``trigger_capture``.
+
+        :param nbytes: the expected size of the capture, defaults to the size of the last capture made by this
+                       process.
+        :return: ``True`` if the capture may start.
+        """
+        mm = self._state()
+        if mm is None:
+            return self.fail_open
+        if not self._lock():
+            return False
+        try:
+            _, active, tokens, last = _STATE.unpack_from(mm, 0)
+            now = time.monotonic()
+            tokens = self._refill(tokens, last, now)
+            allowed = tokens >= 0
+            if allowed:
+                tokens -= self.last_capture_bytes if nbytes is None else nbytes
+            _STATE.pack_into(mm, 0, _MAGIC, active, tokens, now)
+            return allowed
+        finally:
+            self._unlock()
@@ -0,0 +1,158 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .rdc_file import RDCHeader, RDCSection, RDCSectionType, read_rdc_header, iter_rdc_sections, encode_rdc_section
+
+NOTES_SECTION_NAME = "renderdoc/ui/notes"
+"""The name of the section which RenderDoc stores capture comments in."""
+METADATA_KEY = "pyRenderdocApp"
+"""The key in the notes JSON object under which structured metadata is stored."""
+
+_SECTION_TYPE_OFFSET = 4
+_SECTION_NAME_OFFSET = 40
+_STALE_SECTION_NAME = b"pyRenderdocApp/stale"
+
+
+def _is_notes_section(section: RDCSection) -> bool:
+    return (section.section_type == RDCSectionType.eSectionType_Notes.value
+            or section.name == NOTES_SECTION_NAME)
+
+
+def _complete_sections(f, header: RDCHeader) -> List[RDCSection]:
+    # A patch which was interrupted while appending can leave a partial section at the end of the file, which is
+    # ignored here and replaced by the next patch
+    size = os.fstat(f.fileno()).st_size
+    sections = []
+    iterator = iter_rdc_sections(f, header)
+    while True:
+        try:
+            section = next(iterator, None)
+        except ValueError:
+            if f.tell() < size:
+                raise
+            break
+        if section is None or section.end_offset > size:
+            break
+        sections.append(section)
+    return sections
+
+
+def _read_notes(f, section: RDCSection) -> Dict[str, Any]:
+    if section.is_compressed:
+        raise ValueError("Compressed notes sections are not supported!")
+    f.seek(section.data_offset)
+    data = f.read(section.compressed_length)
+    try:
+        notes = json.loads(data.decode("utf-8"))
+    except ValueError:
+        # Notes which aren't JSON are treated as plain comments
+        return {"comments": data.split(b"\0", 1)[0].decode("utf-8", errors="replace")}
+    return notes if isinstance(notes, dict) else {}
+
+
+def read_capture_notes(path: str) -> Dict[str, Any]:
+    """
+    Reads the notes stored in a capture file. Only the section headers and the notes section are read.
+
+    :param path: the path to the capture file.
+    :return: the notes as a dictionary, the comments are stored in the ``"comments"`` key and any structured
+             metadata in the :data:`METADATA_KEY` key. Empty if the capture has no notes.
+    """
+    with open(path, "rb") as f:
+        for section in iter_rdc_sections(f):
+            if _is_notes_section(section):
+                return _read_notes(f, section)
+    return {}
+
+
+def read_capture_metadata(path: str) -> Dict[str, Any]:
+    """
+    Reads the structured metadata stored in a capture file by :func:`set_capture_metadata`.
+
+    :param path: the path to the capture file.
+    :return: the metadata, empty if the capture has none.
+    """
+    metadata = read_capture_notes(path).get(METADATA_KEY, {})
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def set_capture_metadata(path: str, comments: Optional[str] = None,
+                         metadata: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Adds or replaces the comments and metadata of an existing capture file without rewriting it.
+
+    The new notes section is appended to the end of the file and synced to disk, only then is the header of the old
+    notes section relabelled in place so that RenderDoc no longer finds it. The old notes are never overwritten, so
+    an interrupted patch leaves either the old or the new notes readable. Only a few bytes of the original file are
+    touched.
+
+    Metadata is stored as a JSON object under the :data:`METADATA_KEY` key of the notes, next to the comments, so
+    that it can be read back cheaply with :func:`read_capture_metadata`.
+
+    :param path: the path to the capture file.
+    :param comments: the comments to set, if ``None`` the existing comments are kept.
+    :param metadata: metadata to merge into any existing metadata, must be JSON serialisable.
+    """
+    with open(path, "r+b") as f:
+        header = read_rdc_header(f)
+        sections = _complete_sections(f, header)
+        old = [s for s in sections if _is_notes_section(s)]
+
+        notes: Dict[str, Any] = {}
+        if len(old) > 0:
+            notes = _read_notes(f, old[0])
+        if comments is not None:
+            notes["comments"] = comments
+        if metadata is not None:
+            merged = notes.get(METADATA_KEY)
+            merged = dict(merged) if isinstance(merged, dict) else {}
+            merged.update(metadata)
+            notes[METADATA_KEY] = merged
+        data = encode_rdc_section(RDCSectionType.eSectionType_Notes.value, NOTES_SECTION_NAME,
+                                  json.dumps(notes, separators=(",", ":")).encode("utf-8"))
+
+        end = sections[-1].end_offset if len(sections) > 0 else header.header_length
+        f.seek(end)
+        f.write(data)
+        # Drops anything left after the last section by an earlier patch which was interrupted
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+
+        # Hide any older notes sections, only once the new section has been written
+        for section in old:
+            name_length = section.data_offset - section.offset - _SECTION_NAME_OFFSET
+            f.seek(section.offset + _SECTION_TYPE_OFFSET)
+            f.write(RDCSectionType.eSectionType_Unknown.value.to_bytes(4, "little"))
+            f.seek(section.offset + _SECTION_NAME_OFFSET)
+            f.write(_STALE_SECTION_NAME[:name_length - 1].ljust(name_length, b"\0"))
+        if len(old) > 0:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def set_capture_metadata_batch(jobs: Iterable[Tuple[str, Optional[str], Optional[Dict[str, Any]]]],
+                               max_workers: Optional[int] = None) -> List[Optional[Exception]]:
+    """
+    Runs :func:`set_capture_metadata` over many capture files concurrently.
+
+    :param jobs: a sequence of ``(path, comments, metadata)`` tuples.
+    :param max_workers: the maximum number of files to patch at once, defaults to four per CPU (up to 32).
+    :return: for each job, ``None`` if it succeeded or the exception it raised, in the same order as ``jobs``.
+    """
+    def run(job: Tuple[str, Optional[str], Optional[Dict[str, Any]]]) -> Optional[Exception]:
+        try:
+            set_capture_metadata(*job)
+        except (OSError, ValueError, TypeError) as e:
+            return e
+        return None
+
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run, jobs))
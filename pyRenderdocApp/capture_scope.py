@@ -0,0 +1,144 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import functools
+import threading
+from typing import Callable, Optional, TypeVar
+
+from .renderdoc_api import RENDERDOC_API_1_0_0, RenderDocDevicePointer, RenderDocWindowHandle
+
+_F = TypeVar("_F", bound=Callable)
+
+# Captures are global to the process, so only one scope can be capturing at a time
+_active_scope: Optional["CaptureScope"] = None
+_active_depth = 0
+_start_lock = threading.Lock()
+
+
+class CaptureScope:
+    """
+    A context manager, or decorator, which captures the frame rendered inside it when armed.
+
+    The title and comments of the capture are given as callables, which are only called once a capture is actually
+    in progress (the title) or has been kept (the comments), so expensive formatting costs nothing on frames which
+    aren't captured. While the scope isn't armed, entering and exiting it only costs a couple of attribute lookups.
+
+    Nested scopes are flattened: any scope entered while another scope is capturing is ignored, and doesn't use up
+    its arming, so the outermost capturing scope captures everything inside it.
+
+    *Example:*
+        ``shadows = CaptureScope(rdoc_api, title=lambda: f"Shadows: {scene.name}")``
+
+        ``with shadows:``
+            ``render_shadows()``
+
+        ``shadows.arm()  # Capture the next time the shadows are rendered``
+    """
+    __slots__ = ("api", "title", "comments", "device", "wnd_handle", "_armed")
+
+    def __init__(self, api: RENDERDOC_API_1_0_0, title: Optional[Callable[[], str]] = None,
+                 comments: Optional[Callable[[], str]] = None, device: Optional[RenderDocDevicePointer] = None,
+                 wnd_handle: Optional[RenderDocWindowHandle] = None):
+        """
+        :param api: the RenderDoc API to capture with.
+        :param title: called to get the capture's title once the capture has started. Requires API v1.6.0.
+        :param comments: called to get the capture's comments once the capture has been saved. Requires API v1.2.0.
+        :param device: the device to capture, see ``start_frame_capture``.
+        :param wnd_handle: the window to capture, see ``start_frame_capture``.
+        """
+        self.api = api
+        self.title = title
+        self.comments = comments
+        self.device = device
+        self.wnd_handle = wnd_handle
+        self._armed = 0
+
+    def arm(self, count: Optional[int] = 1) -> None:
+        """
+        Arms the scope so that it captures the next time it's entered.
+
+        :param count: how many times to capture, or ``None`` to capture every time until :meth:`disarm` is called.
+        """
+        self._armed = -1 if count is None else count
+
+    def disarm(self) -> None:
+        """
+        Stops the scope from capturing the next time it's entered. A capture which is in progress is not affected.
+        """
+        self._armed = 0
+
+    @property
+    def armed(self) -> bool:
+        """
+        ``True`` if the scope will capture the next time it's entered.
+        """
+        return self._armed != 0
+
+    def __enter__(self) -> "CaptureScope":
+        global _active_scope, _active_depth
+        if _active_scope is not None:
+            if _active_scope is self:
+                _active_depth += 1
+            return self
+        if self._armed == 0:
+            return self
+
+        with _start_lock:
+            if _active_scope is not None:
+                return self
+            api = self.api
+            if api.is_frame_capturing():
+                # A capture was started outside of any scope, overlapping captures are undefined behaviour
+                return self
+            if not api.start_frame_capture(self.device, self.wnd_handle):
+                # The capture limiter refused, try again next time
+                return self
+            if not api.is_frame_capturing():
+                # Nothing to capture, end the capture anyway so that its limiter slot is freed
+                self._abandon()
+                return self
+            _active_scope = self
+            _active_depth = 0
+        if self.title is not None and hasattr(api, "set_capture_title"):
+            try:
+                api.set_capture_title(self.title())
+            except BaseException:
+                _active_scope = None
+                self._abandon()
+                raise
+        if self._armed > 0:
+            self._armed -= 1
+        return self
+
+    def _abandon(self) -> None:
+        # Ends a capture which won't be kept, without saving it if the API allows
+        api = self.api
+        if hasattr(api, "discard_frame_capture"):
+            api.discard_frame_capture(self.device, self.wnd_handle)
+        else:
+            api.end_frame_capture(self.device, self.wnd_handle)
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        global _active_scope, _active_depth
+        if _active_scope is not self:
+            return False
+        if _active_depth > 0:
+            _active_depth -= 1
+            return False
+        _active_scope = None
+
+        api = self.api
+        kept = api.end_frame_capture(self.device, self.wnd_handle)
+        if kept and self.comments is not None and hasattr(api, "set_capture_file_comments"):
+            api.set_capture_file_comments(None, self.comments())
+        return False
+
+    def __call__(self, func: _F) -> _F:
+        """
+        Wraps a function in this capture scope.
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self:
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore
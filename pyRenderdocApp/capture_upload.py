@@ -0,0 +1,320 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import threading
+import time
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from .renderdoc_api import RENDERDOC_API_1_0_0
+
+_MIN_PART_SIZE = 5 * 1024 * 1024
+_MAX_PARTS = 10000
+_RETRIES = 3
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class _NoSuchUpload(OSError):
+    """Raised when S3 no longer knows about a multipart upload, eg: it was aborted or expired."""
+
+
+class UploadResult(NamedTuple):
+    """
+    The result of uploading a capture file.
+    """
+    key: str
+    """The key the capture was uploaded to."""
+    etag: str
+    """The ETag of the uploaded object."""
+    size: int
+    """The size of the capture file in bytes."""
+    sha256: str
+    """The hex SHA-256 digest of the capture file, computed while it was uploaded."""
+    resumed_parts: int
+    """The number of parts which had already been uploaded by an interrupted upload."""
+
+
+def sign_v4(method: str, host: str, path: str, query: Mapping[str, str], headers: Mapping[str, str],
+            payload_hash: str, access_key: str, secret_key: str, region: str, amz_date: str,
+            service: str = "s3") -> str:
+    """
+    Computes an AWS Signature Version 4 ``Authorization`` header.
+
+    :param method: the HTTP method.
+    :param host: the host the request is sent to.
+    :param path: the URI-encoded path of the request.
+    :param query: the query parameters of the request, not encoded.
+    :param headers: the headers to sign, other than ``host``.
+    :param payload_hash: the hex SHA-256 digest of the payload, or ``UNSIGNED-PAYLOAD``.
+    :param access_key: the access key id.
+    :param secret_key: the secret access key.
+    :param region: the region of the bucket.
+    :param amz_date: the time of the request, as in the ``x-amz-date`` header.
+    :param service: the service the request is sent to.
+    :return: the value of the ``Authorization`` header.
+    """
+    all_headers = {k.lower(): " ".join(str(v).split()) for k, v in headers.items()}
+    all_headers["host"] = host
+    signed_headers = ";".join(sorted(all_headers))
+    canonical_query = "&".join(f"{quote(k, safe='~')}={quote(v, safe='~')}" for k, v in sorted(query.items()))
+    canonical_request = "\n".join((method, path, canonical_query,
+                                   "".join(f"{k}:{all_headers[k]}\n" for k in sorted(all_headers)),
+                                   signed_headers, payload_hash))
+    date = amz_date[:8]
+    scope = f"{date}/{region}/{service}/aws4_request"
+    string_to_sign = "\n".join(("AWS4-HMAC-SHA256", amz_date, scope,
+                                hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()))
+    key = ("AWS4" + secret_key).encode("utf-8")
+    for part in (date, region, service, "aws4_request"):
+        key = hmac.new(key, part.encode("utf-8"), hashlib.sha256).digest()
+    signature = hmac.new(key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    return f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, SignedHeaders={signed_headers}, Signature={signature}"
+
+
+class CaptureUploader:
+    """
+    Streams capture files to an S3-compatible object store using multipart uploads.
+
+    Files are read once, part by part: each part is hashed into a SHA-256 of the whole file as it's read, then
+    uploaded by a pool of threads. At most ``max_concurrency + 1`` parts are held in memory at a time.
+
+    The progress of each upload is kept in a small JSON file next to the capture, so that an interrupted upload
+    resumes from the last completed part the next time the file is uploaded. The progress file is removed once the
+    upload completes.
+
+    Buckets are addressed path-style (``endpoint/bucket/key``), which is supported by AWS and most S3-compatible
+    servers.
+    """
+
+    def __init__(self, endpoint_url: str, bucket: str, prefix: str = "", region: str = "us-east-1",
+                 access_key: Optional[str] = None, secret_key: Optional[str] = None,
+                 session_token: Optional[str] = None, part_size: int = 16 * 1024 * 1024,
+                 max_concurrency: int = 4, timeout: float = 60):
+        """
+        :param endpoint_url: the URL of the object store, ie: ``https://s3.us-east-1.amazonaws.com``.
+        :param bucket: the bucket to upload to.
+        :param prefix: a prefix for the keys of uploaded captures.
+        :param region: the region of the bucket.
+        :param access_key: the access key id, defaults to the ``AWS_ACCESS_KEY_ID`` environment variable.
+        :param secret_key: the secret access key, defaults to the ``AWS_SECRET_ACCESS_KEY`` environment variable.
+        :param session_token: a session token for temporary credentials, defaults to the ``AWS_SESSION_TOKEN``
+                              environment variable.
+        :param part_size: the size of each part in bytes, at least 5 MiB. Increased for files too large to upload in
+                          10000 parts.
+        :param max_concurrency: the maximum number of parts to upload at once.
+        :param timeout: the timeout of each request in seconds.
+        """
+        url = urlsplit(endpoint_url)
+        if url.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported endpoint URL: '{endpoint_url}'")
+        self._https = url.scheme == "https"
+        self._host = url.netloc
+        if url.port == _DEFAULT_PORTS[url.scheme]:
+            # http.client leaves the default port out of the Host header, the signed host must match it
+            self._host = self._host.rsplit(":", 1)[0]
+        self._base_path = url.path.rstrip("/")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.region = region
+        self.access_key = access_key if access_key is not None else os.environ.get("AWS_ACCESS_KEY_ID", "")
+        self.secret_key = secret_key if secret_key is not None else os.environ.get("AWS_SECRET_ACCESS_KEY", "")
+        self.session_token = session_token if session_token is not None else os.environ.get("AWS_SESSION_TOKEN")
+        self.part_size = max(part_size, _MIN_PART_SIZE)
+        self.max_concurrency = max(max_concurrency, 1)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._next_capture = 0
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._https:
+                conn = http.client.HTTPSConnection(self._host, timeout=self.timeout)
+            else:
+                conn = http.client.HTTPConnection(self._host, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, method: str, key: str, query: Dict[str, str], body: bytes = b"",
+                 payload_hash: Optional[str] = None) -> Tuple[http.client.HTTPResponse, bytes]:
+        path = quote(f"{self._base_path}/{self.bucket}/{key}", safe="/~")
+        if payload_hash is None:
+            payload_hash = hashlib.sha256(body).hexdigest()
+        headers = {
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+        }
+        if self.session_token:
+            headers["x-amz-security-token"] = self.session_token
+        headers["Authorization"] = sign_v4(method, self._host, path, query, headers, payload_hash,
+                                           self.access_key, self.secret_key, self.region, headers["x-amz-date"])
+        headers["Host"] = self._host
+        headers["Content-Length"] = str(len(body))
+        url = path
+        if len(query) > 0:
+            url += "?" + "&".join(f"{quote(k, safe='~')}={quote(v, safe='~')}" if v else quote(k, safe="~")
+                                  for k, v in query.items())
+
+        for attempt in range(_RETRIES):
+            conn = self._connection()
+            try:
+                conn.request(method, url, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                self._local.conn = None
+                if attempt == _RETRIES - 1:
+                    raise
+            else:
+                if response.status < 500 or attempt == _RETRIES - 1:
+                    break
+            time.sleep(0.1 * 2 ** attempt)
+        if response.status == 404 and b"NoSuchUpload" in data:
+            raise _NoSuchUpload(f"S3 has no upload with the id given for '{key}'")
+        if response.status >= 300:
+            raise OSError(f"S3 {method} request for '{key}' failed with {response.status} {response.reason}: "
+                          f"{data[:200].decode('utf-8', errors='replace')}")
+        return response, data
+
+    def _create_upload(self, key: str) -> str:
+        _, data = self._request("POST", key, {"uploads": ""})
+        upload_id = ElementTree.fromstring(data).findtext("{*}UploadId")
+        if not upload_id:
+            raise OSError(f"S3 didn't return an upload id for '{key}'")
+        return upload_id
+
+    def _upload_part(self, key: str, upload_id: str, number: int, data: bytes) -> str:
+        response, _ = self._request("PUT", key, {"partNumber": str(number), "uploadId": upload_id}, data)
+        return response.getheader("ETag", "")
+
+    def _abort_upload(self, key: str, upload_id: str) -> None:
+        try:
+            self._request("DELETE", key, {"uploadId": upload_id})
+        except _NoSuchUpload:
+            pass
+
+    def _complete_upload(self, key: str, upload_id: str, parts: Dict[int, str]) -> str:
+        body = "<CompleteMultipartUpload>" + "".join(
+            f"<Part><PartNumber>{n}</PartNumber><ETag>{etag}</ETag></Part>" for n, etag in sorted(parts.items())
+        ) + "</CompleteMultipartUpload>"
+        _, data = self._request("POST", key, {"uploadId": upload_id}, body.encode("utf-8"))
+        root = ElementTree.fromstring(data)
+        if root.tag.endswith("Error"):
+            # S3 can report an error with a 200 status once the response has started
+            raise OSError(f"S3 failed to complete the upload of '{key}': {root.findtext('{*}Message')}")
+        return root.findtext("{*}ETag") or ""
+
+    def upload_file(self, path: str, key: Optional[str] = None) -> UploadResult:
+        """
+        Uploads a capture file, resuming an interrupted upload of the same file if there is one. If the interrupted
+        upload has since been aborted or has expired, a new upload is started. If the file or key has changed since
+        the interrupted upload, it's aborted before a new upload is started.
+
+        :param path: the path to the capture file.
+        :param key: the key to upload the capture to, defaults to the prefix followed by the file name.
+        :return: the result of the upload.
+        """
+        if key is None:
+            key = self.prefix + os.path.basename(path)
+        stat = os.stat(path)
+        part_size = max(self.part_size, -(-stat.st_size // _MAX_PARTS))
+        state_path = path + ".upload.json"
+
+        if os.path.exists(state_path):
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if (state.get("key") == key and state.get("size") == stat.st_size
+                    and state.get("mtime") == stat.st_mtime and state.get("part_size") == part_size):
+                try:
+                    return self._upload_parts(path, state, state_path)
+                except _NoSuchUpload:
+                    # The interrupted upload was aborted or has expired, start again with a new upload
+                    pass
+            else:
+                # The file or key has changed since the interrupted upload, abort it so its parts aren't kept
+                self._abort_upload(state["key"], state["upload_id"])
+        state = {"key": key, "size": stat.st_size, "mtime": stat.st_mtime, "part_size": part_size,
+                 "upload_id": self._create_upload(key), "parts": {}}
+        return self._upload_parts(path, state, state_path)
+
+    def _upload_parts(self, path: str, state: Dict[str, Any], state_path: str) -> UploadResult:
+        key = state["key"]
+        part_size = state["part_size"]
+        upload_id = state["upload_id"]
+        parts = {int(n): etag for n, etag in state["parts"].items()}
+        resumed_parts = len(parts)
+        state_lock = threading.Lock()
+
+        def save_state() -> None:
+            tmp_path = state_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(dict(state, parts={str(n): e for n, e in parts.items()}), f)
+            os.replace(tmp_path, state_path)
+
+        save_state()
+        file_hash = hashlib.sha256()
+        in_flight = threading.BoundedSemaphore(self.max_concurrency + 1)
+        futures: List[Future] = []
+        failed = threading.Event()
+
+        def upload(number: int, data: bytes) -> None:
+            try:
+                etag = self._upload_part(key, upload_id, number, data)
+                with state_lock:
+                    parts[number] = etag
+                    save_state()
+            except BaseException:
+                failed.set()
+                raise
+            finally:
+                in_flight.release()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor, open(path, "rb") as f:
+            number = 1
+            while True:
+                in_flight.acquire()
+                data = f.read(part_size)
+                if not data and number > 1:
+                    in_flight.release()
+                    break
+                file_hash.update(data)
+                if number in parts:
+                    in_flight.release()
+                else:
+                    futures.append(executor.submit(upload, number, data))
+                if len(data) < part_size:
+                    break
+                number += 1
+                if failed.is_set():
+                    break
+            for fut in futures:
+                fut.result()
+
+        etag = self._complete_upload(key, upload_id, parts)
+        os.remove(state_path)
+        return UploadResult(key, etag, state["size"], file_hash.hexdigest(), resumed_parts)
+
+    def upload_new_captures(self, api: RENDERDOC_API_1_0_0) -> List[UploadResult]:
+        """
+        Uploads any captures made since the last call, as reported by ``get_capture``.
+
+        :param api: the RenderDoc API to get the captures from.
+        :return: the results of the uploads, in capture order.
+        """
+        results = []
+        num_captures = api.get_num_captures()
+        while self._next_capture < num_captures:
+            valid, path, _, _ = api.get_capture(self._next_capture)
+            if valid and os.path.exists(path):
+                results.append(self.upload_file(path))
+            self._next_capture += 1
+        return results
@@ -0,0 +1,169 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+from typing import BinaryIO, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .rdc_file import RDCHeader, RDCSection, read_rdc_header, iter_rdc_sections, rdc_chunk_histogram
+
+_BLOCK_SIZE = 1 << 20
+
+
+class RDCSectionSummary(NamedTuple):
+    """
+    A structural summary of a single section in a capture file.
+    """
+    section_type: int
+    name: str
+    flags: int
+    version: int
+    compressed_length: int
+    uncompressed_length: int
+    digest: str
+    """A hex digest of the section's data as stored in the file."""
+    chunk_histogram: Optional[Dict[int, int]]
+    """The number of chunks of each type in the section, or ``None`` if the section couldn't be walked."""
+
+
+class RDCSectionDiff(NamedTuple):
+    """
+    A pair of sections which differ between two capture files. Either side may be ``None`` if the section only
+    exists in one of the files.
+    """
+    index: int
+    a: Optional[RDCSectionSummary]
+    b: Optional[RDCSectionSummary]
+
+
+class RDCDiff(NamedTuple):
+    """
+    The structural differences between two capture files.
+    """
+    header_a: RDCHeader
+    header_b: RDCHeader
+    sections: List[RDCSectionDiff]
+    """The sections which differ, in file order."""
+
+    @property
+    def identical(self) -> bool:
+        """
+        ``True`` if the two captures are structurally identical.
+        """
+        return self.header_a.version == self.header_b.version and len(self.sections) == 0
+
+
+def _section_key(section: RDCSection) -> Tuple[int, str, int, int, int, int]:
+    return (section.section_type, section.name, section.flags, section.version,
+            section.compressed_length, section.uncompressed_length)
+
+
+def _hash_section(f: BinaryIO, section: RDCSection, buffer: memoryview) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    f.seek(section.data_offset)
+    remaining = section.compressed_length
+    while remaining > 0:
+        n = f.readinto(buffer[:min(remaining, len(buffer))])
+        if not n:
+            raise ValueError("Unexpected end of capture file!")
+        h.update(buffer[:n])
+        remaining -= n
+    return h.hexdigest()
+
+
+def summarise_capture(path: str, chunk_histograms: bool = True) -> Tuple[RDCHeader, List[RDCSectionSummary]]:
+    """
+    Reads the section table of a capture file and hashes the data of each section.
+
+    :param path: the path to the capture file.
+    :param chunk_histograms: whether to count the chunk types in each uncompressed section.
+    :return: (the header of the capture file, a summary of each section in file order).
+    """
+    buffer = memoryview(bytearray(_BLOCK_SIZE))
+    with open(path, "rb") as f:
+        header = read_rdc_header(f)
+        sections = list(iter_rdc_sections(f, header))
+        summaries = []
+        for section in sections:
+            digest = _hash_section(f, section, buffer)
+            histogram = rdc_chunk_histogram(f, section) if chunk_histograms else None
+            summaries.append(RDCSectionSummary(section.section_type, section.name, section.flags, section.version,
+                                               section.compressed_length, section.uncompressed_length,
+                                               digest, histogram))
+    return header, summaries
+
+
+def diff_captures(path_a: str, path_b: str, chunk_histograms: bool = True) -> RDCDiff:
+    """
+    Compares the section tables, section sizes, section hashes and chunk type histograms of two capture files
+    without replaying either of them.
+
+    Sections are compared pairwise in file order. The thumbnail and driver metadata stored in the file header are
+    not compared.
+
+    :param path_a: the path to the first capture file.
+    :param path_b: the path to the second capture file.
+    :param chunk_histograms: whether to count and compare the chunk types in each uncompressed section.
+    :return: the differences between the two captures.
+    """
+    header_a, sections_a = summarise_capture(path_a, chunk_histograms)
+    header_b, sections_b = summarise_capture(path_b, chunk_histograms)
+    diffs = [RDCSectionDiff(i, a, b)
+             for i, (a, b) in enumerate(zip_longest(sections_a, sections_b))
+             if a != b]
+    return RDCDiff(header_a, header_b, diffs)
+
+
+def captures_differ(path_a: str, path_b: str, compare_data: bool = True) -> bool:
+    """
+    Streams two capture files side by side and returns as soon as a structural difference is found.
+
+    This is much cheaper than :func:`diff_captures` when only a yes/no answer is needed, as the section data is
+    compared block by block and nothing is hashed.
+
+    :param path_a: the path to the first capture file.
+    :param path_b: the path to the second capture file.
+    :param compare_data: if ``False`` only the section tables are compared, the section data is skipped.
+    :return: ``True`` if the captures differ.
+    """
+    with open(path_a, "rb") as fa, open(path_b, "rb") as fb:
+        header_a = read_rdc_header(fa)
+        header_b = read_rdc_header(fb)
+        if header_a.version != header_b.version:
+            return True
+        for a, b in zip_longest(iter_rdc_sections(fa, header_a), iter_rdc_sections(fb, header_b)):
+            if a is None or b is None or _section_key(a) != _section_key(b):
+                return True
+            if not compare_data:
+                continue
+            fa.seek(a.data_offset)
+            fb.seek(b.data_offset)
+            remaining = a.compressed_length
+            while remaining > 0:
+                n = min(remaining, _BLOCK_SIZE)
+                # Comparing bytes objects is a single memcmp, unlike comparing memoryviews
+                block_a = fa.read(n)
+                if block_a != fb.read(n):
+                    return True
+                if not block_a:
+                    break
+                remaining -= len(block_a)
+            # Leave the files where the section iterators expect them
+            fa.seek(a.end_offset)
+            fb.seek(b.end_offset)
+    return False
+
+
+def captures_differ_many(pairs: Iterable[Tuple[str, str]], compare_data: bool = True,
+                         max_workers: Optional[int] = None) -> List[bool]:
+    """
+    Runs :func:`captures_differ` over many pairs of capture files concurrently.
+
+    :param pairs: the pairs of capture files to compare.
+    :param compare_data: if ``False`` only the section tables are compared, the section data is skipped.
+    :param max_workers: the maximum number of files to compare at once, defaults to the executor's default.
+    :return: whether each pair of captures differs, in the same order as ``pairs``.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda p: captures_differ(p[0], p[1], compare_data), pairs))
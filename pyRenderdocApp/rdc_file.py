@@ -0,0 +1,220 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+# Layout ported from renderdoc/serialise/rdcfile.cpp, available under the MIT license Copyright (c) 2019-2023 Baldur
+# Karlsson https://github.com/baldurk/renderdoc/blob/v1.x/renderdoc/serialise/rdcfile.cpp
+
+import struct
+from enum import Enum, Flag
+from typing import BinaryIO, Dict, Iterator, NamedTuple, Optional
+
+RDC_MAGIC = 0x434F4452
+"""The magic number at the start of every ``.rdc`` file, ``'RDOC'`` as a little-endian FOURCC."""
+
+_FILE_HEADER = struct.Struct("<QII16s")
+_SECTION_HEADER = struct.Struct("<B3xIQQQII")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+
+_CHUNK_INDEX_MASK = 0x0000ffff
+_CHUNK_CALLSTACK = 0x00010000
+_CHUNK_THREAD_ID = 0x00020000
+_CHUNK_DURATION = 0x00040000
+_CHUNK_TIMESTAMP = 0x00080000
+_CHUNK_64BIT_SIZE = 0x00100000
+
+
+class RDCSectionType(Enum):
+    """
+    The known section types which can be stored in a capture file.
+    """
+    eSectionType_Unknown = 0
+    eSectionType_FrameCapture = 1
+    eSectionType_ResolveDatabase = 2
+    eSectionType_Bookmarks = 3
+    eSectionType_Notes = 4
+    eSectionType_ResourceRenames = 5
+    eSectionType_AMDRGPProfile = 6
+    eSectionType_ExtendedThumbnail = 7
+    eSectionType_EmbeddedLogfile = 8
+    eSectionType_EditedShaders = 9
+    eSectionType_D3D12Core = 10
+    eSectionType_D3D12SDKLayers = 11
+
+
+class RDCSectionFlags(Flag):
+    """
+    Flags describing how a section's data is stored on disk.
+    """
+    eSectionFlags_NoFlags = 0
+    eSectionFlags_ASCIIStored = 0x1
+    eSectionFlags_LZ4Compressed = 0x2
+    eSectionFlags_ZstdCompressed = 0x4
+
+
+class RDCHeader(NamedTuple):
+    """
+    The fixed header at the start of a capture file.
+    """
+    version: int
+    """The serialisation version of the capture file."""
+    header_length: int
+    """The total length of the file header (including the thumbnail and driver metadata) in bytes."""
+    prog_version: str
+    """The version string of the RenderDoc build which wrote the capture."""
+
+
+class RDCSection(NamedTuple):
+    """
+    The header of a single section in a capture file. The section's data is not loaded.
+    """
+    index: int
+    """The index of the section in the file."""
+    offset: int
+    """The offset of the section header in the file."""
+    data_offset: int
+    """The offset of the section's data in the file."""
+    section_type: int
+    """The type of the section, see :class:`RDCSectionType`. Unknown types are preserved as-is."""
+    name: str
+    """The name of the section."""
+    flags: int
+    """How the section is stored, see :class:`RDCSectionFlags`."""
+    version: int
+    """The section's own version number."""
+    compressed_length: int
+    """The length of the section's data as stored in the file."""
+    uncompressed_length: int
+    """The length of the section's data once decompressed."""
+
+    @property
+    def is_compressed(self) -> bool:
+        """
+        ``True`` if the section's data is stored compressed.
+        """
+        return (self.flags & (RDCSectionFlags.eSectionFlags_LZ4Compressed.value |
+                              RDCSectionFlags.eSectionFlags_ZstdCompressed.value)) != 0
+
+    @property
+    def end_offset(self) -> int:
+        """
+        The offset of the first byte after this section.
+        """
+        return self.data_offset + self.compressed_length
+
+
+def _read_exact(f: BinaryIO, n: int) -> bytes:
+    data = f.read(n)
+    if len(data) != n:
+        raise ValueError("Unexpected end of capture file!")
+    return data
+
+
+def read_rdc_header(f: BinaryIO) -> RDCHeader:
+    """
+    Reads the header of a capture file. The file is read from its start.
+
+    :param f: a capture file opened in binary mode.
+    :return: the header of the capture file.
+    """
+    f.seek(0)
+    magic, version, header_length, prog_version = _FILE_HEADER.unpack(_read_exact(f, _FILE_HEADER.size))
+    if magic != RDC_MAGIC:
+        raise ValueError("Not a RenderDoc capture file!")
+    if header_length < _FILE_HEADER.size:
+        raise ValueError(f"Invalid capture file header length: {header_length}")
+    return RDCHeader(version, header_length,
+                     prog_version.split(b"\0", 1)[0].decode("utf-8", errors="replace"))
+
+
+def iter_rdc_sections(f: BinaryIO, header: Optional[RDCHeader] = None) -> Iterator[RDCSection]:
+    """
+    Iterates over the section headers of a capture file, seeking over the data of each section.
+
+    :param f: a capture file opened in binary mode.
+    :param header: the header of the capture file if it has already been read.
+    :return: an iterator over the sections in the capture file, in file order.
+    """
+    if header is None:
+        header = read_rdc_header(f)
+    offset = header.header_length
+    f.seek(offset)
+    index = 0
+    while True:
+        raw = f.read(_SECTION_HEADER.size)
+        if not raw:
+            return
+        if len(raw) != _SECTION_HEADER.size:
+            raise ValueError(f"Truncated section header at offset {offset}")
+        if raw[0] != 0:
+            raise ValueError(f"ASCII sections are not supported (at offset {offset})")
+        (_, section_type, compressed_length, uncompressed_length,
+         version, flags, name_length) = _SECTION_HEADER.unpack(raw)
+        name = _read_exact(f, name_length).split(b"\0", 1)[0].decode("utf-8", errors="replace")
+        data_offset = offset + _SECTION_HEADER.size + name_length
+        section = RDCSection(index, offset, data_offset, section_type, name, flags, version,
+                             compressed_length, uncompressed_length)
+        yield section
+        offset = section.end_offset
+        f.seek(offset)
+        index += 1
+
+
+def rdc_chunk_histogram(f: BinaryIO, section: RDCSection) -> Optional[Dict[int, int]]:
+    """
+    Counts the chunks of each type in a section by walking the chunk headers and seeking over the chunk data.
+
+    Only uncompressed sections can be walked, compressed sections return ``None``, as do sections which don't
+    contain a valid chunk stream.
+
+    :param f: a capture file opened in binary mode.
+    :param section: the section to walk.
+    :return: a dictionary mapping chunk ids to the number of chunks of that type, or ``None``.
+    """
+    if section.is_compressed:
+        return None
+    histogram: Dict[int, int] = {}
+    end = section.end_offset
+    pos = section.data_offset
+    f.seek(pos)
+    try:
+        while pos < end:
+            chunk_id = _U32.unpack(_read_exact(f, 4))[0]
+            skip = 0
+            if chunk_id & _CHUNK_CALLSTACK:
+                skip += _U32.unpack(_read_exact(f, 4))[0] * 8
+            if chunk_id & _CHUNK_THREAD_ID:
+                skip += 8
+            if chunk_id & _CHUNK_DURATION:
+                skip += 8
+            if chunk_id & _CHUNK_TIMESTAMP:
+                skip += 8
+            if skip:
+                f.seek(skip, 1)
+            if chunk_id & _CHUNK_64BIT_SIZE:
+                length = _U64.unpack(_read_exact(f, 8))[0]
+            else:
+                length = _U32.unpack(_read_exact(f, 4))[0]
+            pos = f.seek(length, 1)
+            idx = chunk_id & _CHUNK_INDEX_MASK
+            histogram[idx] = histogram.get(idx, 0) + 1
+    except ValueError:
+        return None
+    if pos != end:
+        return None
+    return histogram
+
+
+def encode_rdc_section(section_type: int, name: str, data: bytes, version: int = 1, flags: int = 0) -> bytes:
+    """
+    Encodes a complete section (header and data) ready to be written to a capture file.
+
+    :param section_type: the type of the section, see :class:`RDCSectionType`.
+    :param name: the name of the section.
+    :param data: the section's data, stored as-is.
+    :param version: the section's own version number.
+    :param flags: how the section's data is stored, see :class:`RDCSectionFlags`.
+    :return: the encoded section.
+    """
+    name_bytes = name.encode("utf-8") + b"\0"
+    return _SECTION_HEADER.pack(0, section_type, len(data), len(data), version, flags, len(name_bytes)) \
+        + name_bytes + data
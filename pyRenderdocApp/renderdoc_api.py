@@ -2,9 +2,13 @@
 #  Distributed under the terms of the MIT license.
 
 import codecs
+import os
+import threading
+import time
+import weakref
 from ctypes import *
 from datetime import datetime
-from typing import Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple
 import sys
 if sys.version_info >= (3, 10):
     from typing import TypeAlias
@@ -12,6 +16,9 @@ else:
     from typing_extensions import TypeAlias
 
 from .renderdoc_enums import *
+from .capture_limiter import CaptureRateLimiter
+from .capture_history import CaptureHistory, CaptureCost, TRACKED_OPTIONS
+from ._api_table import API_PROTOTYPES, API_FUNCTION_COUNTS
 
 RenderDocDevicePointer: TypeAlias = c_void_p
 """
@@ -27,97 +34,116 @@ This would be an ``HWND``, ``GLXDrawable``, etc
 """
 
 
-class RENDERDOC_API_1_6_0:
+_instances: "weakref.WeakSet[RENDERDOC_API_1_0_0]" = weakref.WeakSet()
+_bound_apis: "weakref.WeakValueDictionary[Tuple[str, int], RENDERDOC_API_1_0_0]" = weakref.WeakValueDictionary()
+
+
+def _rebind_api(library_path: str, version: int) -> "RENDERDOC_API_1_0_0":
+    """
+    Gets the API for the given library and version, loading the library if it hasn't been loaded by this process.
+    Used to unpickle API objects.
+    """
+    api = _bound_apis.get((library_path, version))
+    if api is None:
+        api_version = RENDERDOC_Version(version)
+        api = RENDERDOC_API_CLASSES[api_version](CDLL(library_path), api_version)
+    return api
+
+
+def _after_fork() -> None:
+    # The library stays mapped in the child, but its function table is fetched again so that the child never relies
+    # on state which was only valid in the parent
+    for api in list(_instances):
+        try:
+            api._bind()
+        except Exception:
+            # Exceptions can't escape an at-fork hook, the old function table is still mapped so keep using it
+            pass
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def _reset_limiter_slots() -> None:
+    # Limiter slots are held on behalf of the parent's pid, so a forked child starts without any
+    for api in list(_instances):
+        api._limiter_lock = threading.Lock()
+        api._limiter_slots = 0
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_limiter_slots)
+
+
+class RENDERDOC_API_1_0_0:
     """
-    RenderDoc API v1.6.0 wrapper, method names match those in renderdoc_app.h, with the caveat that they have been
+    RenderDoc API v1.0.0 wrapper, method names match those in renderdoc_app.h, with the caveat that they have been
     transformed to snake case (ie: ``GetAPIVersion()`` --> ``get_api_version()``). Documentation available at:
     https://renderdoc.org/docs/in_application_api.html
+
+    Later versions of the API are wrapped by subclasses which add the functions introduced in each version, use
+    :func:`get_render_doc_api` to get the highest version supported by a RenderDoc library.
     """
 
-    def __init__(self, dll: CDLL):
-        api = c_void_p()
-        success = dll.RENDERDOC_GetAPI(RENDERDOC_Version.eRENDERDOC_API_Version_1_6_0.value, byref(api))
-        if success != 1:
-            raise SystemError(f"Failed to get renderdoc API: {success}")
-        addr = api  # cast(api, POINTER(c_void_p)).contents.value
-
-        def next_addr():
-            nonlocal addr
-            ret = cast(addr, POINTER(c_void_p)).contents.value
-            addr.value += size
-            return ret
-
-        size = sizeof(c_void_p)
-        # pRENDERDOC_GetAPIVersion GetAPIVersion;
-        self._GetAPIVersion = CFUNCTYPE(None, POINTER(c_int), POINTER(c_int), POINTER(c_int))(next_addr())
-
-        # pRENDERDOC_SetCaptureOptionU32 SetCaptureOptionU32;
-        self._SetCaptureOptionU32 = CFUNCTYPE(c_int, c_int, c_uint32)(next_addr())
-        # pRENDERDOC_SetCaptureOptionF32 SetCaptureOptionF32;
-        self._SetCaptureOptionF32 = CFUNCTYPE(c_int, c_int, c_float)(next_addr())
-
-        # pRENDERDOC_GetCaptureOptionU32 GetCaptureOptionU32;
-        self._GetCaptureOptionU32 = CFUNCTYPE(c_uint32, c_int)(next_addr())
-        # pRENDERDOC_GetCaptureOptionF32 GetCaptureOptionF32;
-        self._GetCaptureOptionF32 = CFUNCTYPE(c_float, c_int)(next_addr())
-
-        # pRENDERDOC_SetFocusToggleKeys SetFocusToggleKeys;
-        self._SetFocusToggleKeys = CFUNCTYPE(None, POINTER(c_int), c_int)(next_addr())
-        # pRENDERDOC_SetCaptureKeys SetCaptureKeys;
-        self._SetCaptureKeys = CFUNCTYPE(None, POINTER(c_int), c_int)(next_addr())
-
-        # pRENDERDOC_GetOverlayBits GetOverlayBits;
-        self._GetOverlayBits = CFUNCTYPE(c_uint32)(next_addr())
-        # pRENDERDOC_MaskOverlayBits MaskOverlayBits;
-        self._MaskOverlayBits = CFUNCTYPE(None, c_uint32, c_uint32)(next_addr())
-
-        # pRENDERDOC_RemoveHooks RemoveHooks;
-        self._RemoveHooks = CFUNCTYPE(None)(next_addr())
-        # pRENDERDOC_UnloadCrashHandler UnloadCrashHandler;
-        self._UnloadCrashHandler = CFUNCTYPE(None)(next_addr())
-
-        # pRENDERDOC_SetCaptureFilePathTemplate SetCaptureFilePathTemplate;
-        self._SetCaptureFilePathTemplate = CFUNCTYPE(None, c_char_p)(next_addr())
-        # pRENDERDOC_GetCaptureFilePathTemplate GetCaptureFilePathTemplate;
-        self._GetCaptureFilePathTemplate = CFUNCTYPE(c_char_p)(next_addr())
-
-        # pRENDERDOC_GetNumCaptures GetNumCaptures;
-        self._GetNumCaptures = CFUNCTYPE(c_uint32)(next_addr())
-        # pRENDERDOC_GetCapture GetCapture;
-        self._GetCapture = CFUNCTYPE(c_uint32, c_uint32, c_char_p, POINTER(c_uint32), POINTER(c_uint64))(next_addr())
-
-        # pRENDERDOC_TriggerCapture TriggerCapture;
-        self._TriggerCapture = CFUNCTYPE(None)(next_addr())
-
-        # pRENDERDOC_IsTargetControlConnected IsTargetControlConnected;
-        self._IsTargetControlConnected = CFUNCTYPE(c_uint32)(next_addr())
-        # pRENDERDOC_LaunchReplayUI LaunchReplayUI;
-        self._LaunchReplayUI = CFUNCTYPE(c_uint32, c_uint32, c_char_p)(next_addr())
-
-        # pRENDERDOC_SetActiveWindow SetActiveWindow;
-        self._SetActiveWindow = CFUNCTYPE(None, c_void_p, c_void_p)(next_addr())
-
-        # pRENDERDOC_StartFrameCapture StartFrameCapture;
-        self._StartFrameCapture = CFUNCTYPE(None, c_void_p, c_void_p)(next_addr())
-        # pRENDERDOC_IsFrameCapturing IsFrameCapturing;
-        self._IsFrameCapturing = CFUNCTYPE(c_uint32)(next_addr())
-        # pRENDERDOC_EndFrameCapture EndFrameCapture;
-        self._EndFrameCapture = CFUNCTYPE(c_uint32, c_void_p, c_void_p)(next_addr())
-
-        # pRENDERDOC_TriggerMultiFrameCapture TriggerMultiFrameCapture;
-        self._TriggerMultiFrameCapture = CFUNCTYPE(None, c_uint32)(next_addr())
-
-        # pRENDERDOC_SetCaptureFileComments SetCaptureFileComments;
-        self._SetCaptureFileComments = CFUNCTYPE(None, c_char_p, c_char_p)(next_addr())
-
-        # pRENDERDOC_DiscardFrameCapture DiscardFrameCapture;
-        self._DiscardFrameCapture = CFUNCTYPE(c_uint32, c_void_p, c_void_p)(next_addr())
-
-        # pRENDERDOC_ShowReplayUI ShowReplayUI;
-        self._ShowReplayUI = CFUNCTYPE(c_uint32)(next_addr())
-
-        # pRENDERDOC_SetCaptureTitle SetCaptureTitle;
-        self._SetCaptureTitle = CFUNCTYPE(None, c_char_p)(next_addr())
+    _VERSION = RENDERDOC_Version.eRENDERDOC_API_Version_1_0_0
+
+    def __init__(self, dll: CDLL, version: Optional[RENDERDOC_Version] = None, api_table: Optional[int] = None):
+        """
+        :param dll: the RenderDoc library.
+        :param version: the API version to request, defaults to the version wrapped by this class. Must provide all
+                        the functions wrapped by this class.
+        :param api_table: the address of the function table already returned by ``RENDERDOC_GetAPI`` for
+                          ``version``, if it's ``None`` the table is requested from the library.
+        """
+        if version is None:
+            version = self._VERSION
+        if API_FUNCTION_COUNTS[version] < API_FUNCTION_COUNTS[self._VERSION]:
+            raise ValueError(f"API version {version.name} is too old for {type(self).__name__}")
+        self._dll = dll
+        self._version = version
+        self._limiter: Optional[CaptureRateLimiter] = None
+        self._limiter_slots = 0
+        self._limiter_lock = threading.Lock()
+        self._history: Optional[CaptureHistory] = None
+        self._bind(api_table)
+        _instances.add(self)
+        _bound_apis.setdefault((self.library_path, self._version.value), self)
+
+    def __reduce__(self):
+        # Only the library path and version are pickled, the function pointers are re-bound on the other side
+        return _rebind_api, (self.library_path, self._version.value)
+
+    @property
+    def library_path(self) -> str:
+        """
+        The path of the RenderDoc library this API was loaded from.
+        """
+        return self._dll._name
+
+    @property
+    def version(self) -> RENDERDOC_Version:
+        """
+        The API version which was requested from RenderDoc.
+        """
+        return self._version
+
+    def _bind(self, api_table: Optional[int] = None) -> None:
+        """
+        Gets the API's function table from the RenderDoc library.
+
+        :param api_table: the address of the function table, if it's already been returned by ``RENDERDOC_GetAPI``.
+        """
+        if api_table is None:
+            api = c_void_p()
+            success = self._dll.RENDERDOC_GetAPI(self._version.value, byref(api))
+            if success != 1:
+                raise SystemError(f"Failed to get renderdoc API: {success}")
+            api_table = api.value
+        prototypes = API_PROTOTYPES[:API_FUNCTION_COUNTS[self._VERSION]]
+        table = (c_void_p * len(prototypes)).from_address(api_table)
+        for (name, prototype), addr in zip(prototypes, table):
+            setattr(self, name, prototype(addr))
 
     @staticmethod
     def _encode_str(s: Optional[str]) -> c_char_p:
@@ -305,22 +331,6 @@ class RENDERDOC_API_1_6_0:
                 pathlength.value,
                 datetime.fromtimestamp(timestamp.value))
 
-    def set_capture_file_comments(self, file_path: Optional[str], comments: str) -> None:
-        """
-        Sets the comments associated with a capture file. These comments are displayed in the
-        UI program when opening.
-
-        ``file_path`` should be a path to the capture file to add comments to. If set to ``None`` or ""
-        the most recent capture file created made will be used instead.
-        comments should be a NULL-terminated UTF-8 string to add as comments.
-
-        Any existing comments will be overwritten.
-
-        :param file_path: the path to the capture file to add comments to.
-        :param comments: the comments to add to the capture file.
-        """
-        self._SetCaptureFileComments(self._encode_str(file_path), self._encode_str(comments))
-
     def is_target_control_connected(self) -> bool:
         """
         Returns ``True`` if the RenderDoc UI is connected to this application.
@@ -343,19 +353,6 @@ class RENDERDOC_API_1_6_0:
         return self._LaunchReplayUI(c_uint32(1 if connect_target_control else 0),
                                     c_char_p(None if cmd_line is None else codecs.encode(cmd_line, encoding="utf-8")))
 
-    def show_replay_ui(self) -> bool:
-        """
-        Requests that the replay UI show itself (if hidden or not the current top window). This can be
-        used in conjunction with IsTargetControlConnected and LaunchReplayUI to intelligently handle
-        showing the UI after making a capture.
-
-        :return: ``True`` if the request was successfully passed on, though it's not guaranteed that
-                 the UI will be on top in all cases depending on OS rules. It will return ``False``
-                 if there is no current control connection to make such a request, or if there was
-                 another error.
-        """
-        return self._ShowReplayUI() == 1
-
     def set_active_window(self, device: RenderDocDevicePointer, wnd_handle: RenderDocWindowHandle) -> None:
         """
         This sets the RenderDoc in-app overlay in the API/window pair as 'active' and it will
@@ -367,22 +364,21 @@ class RENDERDOC_API_1_6_0:
         """
         self._SetActiveWindow(device, wnd_handle)
 
-    def trigger_capture(self) -> None:
+    def trigger_capture(self) -> bool:
         """
         Capture the next frame on whichever window and API is currently considered active.
-        """
-        self._TriggerCapture()
 
-    def trigger_multi_frame_capture(self, num_frames: int) -> None:
-        """
-        Capture the next N frames on whichever window and API is currently considered active.
+        If a capture limiter is set and the host's capture budget is used up, no capture is triggered.
 
-        :param num_frames: how many frames to capture.
+        :return: ``False`` if the capture limiter refused the capture, otherwise ``True``.
         """
-        self._TriggerMultiFrameCapture(c_uint32(num_frames))
+        if self._limiter is not None and not self._limiter.try_consume():
+            return False
+        self._TriggerCapture()
+        return True
 
     def start_frame_capture(self, device: Optional[RenderDocDevicePointer],
-                            wnd_handle: Optional[RenderDocWindowHandle]) -> None:
+                            wnd_handle: Optional[RenderDocWindowHandle]) -> bool:
         """
         When choosing either a device pointer or a window handle to capture, you can pass ``None``.
         Passing ``None`` specifies a 'wildcard' match against anything. This allows you to specify
@@ -403,15 +399,25 @@ class RENDERDOC_API_1_6_0:
         The results are undefined (including crashes) if two captures are started overlapping,
         even on separate devices and/or windows.
 
+        If a capture limiter is set and the host's capture budget is used up, no capture is started.
+
         :param device: the pointer to the graphics API's device (This would be an ``ID3D11Device``,
                        ``HGLRC``/``GLXContext``, ``ID3D12Device``, etc...).
         :param wnd_handle: the handle to the OS window (This would be an ``HWND``, ``GLXDrawable``, etc...).
+        :return: ``False`` if the capture limiter refused the capture, otherwise ``True``. RenderDoc may still not
+                 capture anything, check :meth:`is_frame_capturing` to know whether a capture started.
         """
         if device is None:
             device = c_void_p(None)
         if wnd_handle is None:
             wnd_handle = c_void_p(None)
+        with self._limiter_lock:
+            if self._limiter is not None:
+                if not self._limiter.try_acquire():
+                    return False
+                self._limiter_slots += 1
         self._StartFrameCapture(device, wnd_handle)
+        return True
 
     def is_frame_capturing(self) -> bool:
         """
@@ -435,7 +441,138 @@ class RENDERDOC_API_1_6_0:
             device = c_void_p(None)
         if wnd_handle is None:
             wnd_handle = c_void_p(None)
-        return self._EndFrameCapture(device, wnd_handle) == 1
+        start = time.perf_counter()
+        success = self._EndFrameCapture(device, wnd_handle) == 1
+        stall = time.perf_counter() - start
+        if self._limiter_slots > 0 or (success and self._history is not None):
+            size = self._latest_capture_size() if success else 0
+            self._release_limiter_slot(size)
+            if success and self._history is not None:
+                self._history.record(self._tracked_options(), stall, size)
+        return success
+
+    def set_capture_limiter(self, limiter: Optional[CaptureRateLimiter]) -> None:
+        """
+        Sets a host-wide limiter which is consulted before any capture is started or triggered, this allows several
+        processes on the same host to share a budget of concurrent captures and disk bandwidth.
+
+        :param limiter: the limiter to use, or ``None`` to remove the limit.
+        """
+        with self._limiter_lock:
+            if self._limiter is not None:
+                for _ in range(self._limiter_slots):
+                    self._limiter.release(0)
+            self._limiter = limiter
+            self._limiter_slots = 0
+
+    def _release_limiter_slot(self, nbytes: int) -> None:
+        """
+        Releases one of the limiter slots taken by :meth:`start_frame_capture`, if any are held.
+        """
+        with self._limiter_lock:
+            if self._limiter_slots > 0:
+                self._limiter_slots -= 1
+                self._limiter.release(nbytes)
+
+    def _latest_capture_size(self) -> int:
+        """
+        Gets the size in bytes of the most recent capture file, or 0 if it can't be found.
+        """
+        valid, path, _, _ = self.get_capture(self.get_num_captures() - 1)
+        if not valid:
+            return 0
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def set_capture_history(self, history: Optional[CaptureHistory]) -> None:
+        """
+        Sets a history to record the active capture options, ``end_frame_capture`` stall time and file size of
+        every capture made with ``end_frame_capture`` in.
+
+        :param history: the history to record captures in, or ``None`` to stop recording.
+        """
+        self._history = history
+
+    def estimate_capture_cost(self, options: Optional[Dict[RENDERDOC_CaptureOption, int]] = None) \
+            -> Optional[CaptureCost]:
+        """
+        Estimates the stall time and file size of a capture from the captures recorded in the capture history.
+
+        :param options: the capture options to estimate the cost for, any options not given take their current
+                        values.
+        :return: the estimated cost, or ``None`` if there's no capture history or nothing has been recorded yet.
+        """
+        if self._history is None:
+            return None
+        current = self._tracked_options()
+        if options is not None:
+            current.update(options)
+        return self._history.estimate_capture_cost(current)
+
+    def _tracked_options(self) -> Dict[RENDERDOC_CaptureOption, int]:
+        """
+        Gets the current values of the capture options which affect the cost of a capture.
+        """
+        return {option: self.get_capture_option_u32(option) for option in TRACKED_OPTIONS}
+
+
+class RENDERDOC_API_1_1_0(RENDERDOC_API_1_0_0):
+    """
+    RenderDoc API v1.1.0 wrapper, adds ``trigger_multi_frame_capture()``.
+    """
+
+    _VERSION = RENDERDOC_Version.eRENDERDOC_API_Version_1_1_0
+
+    def trigger_multi_frame_capture(self, num_frames: int) -> bool:
+        """
+        Capture the next N frames on whichever window and API is currently considered active.
+
+        If a capture limiter is set and the host's capture budget is used up, no capture is triggered.
+
+        :param num_frames: how many frames to capture.
+        :return: ``False`` if the capture limiter refused the capture, otherwise ``True``.
+        """
+        if self._limiter is not None and not self._limiter.try_consume(self._limiter.last_capture_bytes * num_frames):
+            return False
+        self._TriggerMultiFrameCapture(c_uint32(num_frames))
+        return True
+
+
+class RENDERDOC_API_1_2_0(RENDERDOC_API_1_1_0):
+    """
+    RenderDoc API v1.2.0 wrapper, adds ``set_capture_file_comments()``.
+    """
+
+    _VERSION = RENDERDOC_Version.eRENDERDOC_API_Version_1_2_0
+
+    def set_capture_file_comments(self, file_path: Optional[str], comments: str) -> None:
+        """
+        Sets the comments associated with a capture file. These comments are displayed in the
+        UI program when opening.
+
+        ``file_path`` should be a path to the capture file to add comments to. If set to ``None`` or ""
+        the most recent capture file created made will be used instead.
+        comments should be a NULL-terminated UTF-8 string to add as comments.
+
+        Any existing comments will be overwritten.
+
+        To add comments to existing capture files offline, see
+        :func:`pyRenderdocApp.capture_metadata.set_capture_metadata`.
+
+        :param file_path: the path to the capture file to add comments to.
+        :param comments: the comments to add to the capture file.
+        """
+        self._SetCaptureFileComments(self._encode_str(file_path), self._encode_str(comments))
+
+
+class RENDERDOC_API_1_4_0(RENDERDOC_API_1_2_0):
+    """
+    RenderDoc API v1.4.0 wrapper, adds ``discard_frame_capture()``.
+    """
+
+    _VERSION = RENDERDOC_Version.eRENDERDOC_API_Version_1_4_0
 
     def discard_frame_capture(self, device: Optional[RenderDocDevicePointer],
                               wnd_handle: Optional[RenderDocWindowHandle]) -> bool:
@@ -452,7 +589,38 @@ class RENDERDOC_API_1_6_0:
             device = c_void_p(None)
         if wnd_handle is None:
             wnd_handle = c_void_p(None)
-        return self._DiscardFrameCapture(device, wnd_handle) == 1
+        success = self._DiscardFrameCapture(device, wnd_handle) == 1
+        self._release_limiter_slot(0)
+        return success
+
+
+class RENDERDOC_API_1_5_0(RENDERDOC_API_1_4_0):
+    """
+    RenderDoc API v1.5.0 wrapper, adds ``show_replay_ui()``.
+    """
+
+    _VERSION = RENDERDOC_Version.eRENDERDOC_API_Version_1_5_0
+
+    def show_replay_ui(self) -> bool:
+        """
+        Requests that the replay UI show itself (if hidden or not the current top window). This can be
+        used in conjunction with IsTargetControlConnected and LaunchReplayUI to intelligently handle
+        showing the UI after making a capture.
+
+        :return: ``True`` if the request was successfully passed on, though it's not guaranteed that
+                 the UI will be on top in all cases depending on OS rules. It will return ``False``
+                 if there is no current control connection to make such a request, or if there was
+                 another error.
+        """
+        return self._ShowReplayUI() == 1
+
+
+class RENDERDOC_API_1_6_0(RENDERDOC_API_1_5_0):
+    """
+    RenderDoc API v1.6.0 wrapper, adds ``set_capture_title()``.
+    """
+
+    _VERSION = RENDERDOC_Version.eRENDERDOC_API_Version_1_6_0
 
     def set_capture_title(self, title: str) -> None:
         """
@@ -468,3 +636,49 @@ class RENDERDOC_API_1_6_0:
         :param title: the title to give the capture.
         """
         self._SetCaptureTitle(self._encode_str(title))
+
+
+# The versions with no new functions share the wrapper of the previous version, as in renderdoc_app.h
+RENDERDOC_API_1_0_1 = RENDERDOC_API_1_0_0
+RENDERDOC_API_1_0_2 = RENDERDOC_API_1_0_0
+RENDERDOC_API_1_1_1 = RENDERDOC_API_1_1_0
+RENDERDOC_API_1_1_2 = RENDERDOC_API_1_1_0
+RENDERDOC_API_1_3_0 = RENDERDOC_API_1_2_0
+RENDERDOC_API_1_4_1 = RENDERDOC_API_1_4_0
+RENDERDOC_API_1_4_2 = RENDERDOC_API_1_4_0
+
+RENDERDOC_API_CLASSES: Dict[RENDERDOC_Version, type] = {
+    RENDERDOC_Version.eRENDERDOC_API_Version_1_0_0: RENDERDOC_API_1_0_0,
+    RENDERDOC_Version.eRENDERDOC_API_Version_1_0_1: RENDERDOC_API_1_0_1,
+    RENDERDOC_Version.eRENDERDOC_API_Version_1_0_2: RENDERDOC_API_1_0_2,
+    RENDERDOC_Version.eRENDERDOC_API_Version_1_1_0: RENDERDOC_API_1_1_0,
+    RENDERDOC_Version.eRENDERDOC_API_Version_1_1_1: RENDERDOC_API_1_1_1,
+    RENDERDOC_Version.eRENDERDOC_API_Version_1_1_2: RENDERDOC_API_1_1_2,
+    RENDERDOC_Version.eRENDERDOC_API_Version_1_2_0: RENDERDOC_API_1_2_0,
+    RENDERDOC_Version.eRENDERDOC_API_Version_1_3_0: RENDERDOC_API_1_3_0,
+    RENDERDOC_Version.eRENDERDOC_API_Version_1_4_0: RENDERDOC_API_1_4_0,
+    RENDERDOC_Version.eRENDERDOC_API_Version_1_4_1: RENDERDOC_API_1_4_1,
+    RENDERDOC_Version.eRENDERDOC_API_Version_1_4_2: RENDERDOC_API_1_4_2,
+    RENDERDOC_Version.eRENDERDOC_API_Version_1_5_0: RENDERDOC_API_1_5_0,
+    RENDERDOC_Version.eRENDERDOC_API_Version_1_6_0: RENDERDOC_API_1_6_0,
+}
+"""The wrapper class for each API version."""
+
+
+def get_render_doc_api(dll: CDLL, min_version: RENDERDOC_Version = RENDERDOC_Version.eRENDERDOC_API_Version_1_0_0) \
+        -> RENDERDOC_API_1_0_0:
+    """
+    Negotiates the highest API version supported by a RenderDoc library.
+
+    :param dll: the RenderDoc library.
+    :param min_version: the oldest API version which is acceptable.
+    :return: the wrapper for the highest supported API version, check its type or :attr:`~RENDERDOC_API_1_0_0.version`
+             before calling functions added in later versions.
+    """
+    api = c_void_p()
+    for version in sorted(RENDERDOC_API_CLASSES, key=lambda v: v.value, reverse=True):
+        if version.value < min_version.value:
+            break
+        if dll.RENDERDOC_GetAPI(version.value, byref(api)) == 1:
+            return RENDERDOC_API_CLASSES[version](dll, version, api.value)
+    raise SystemError(f"Renderdoc library doesn't support API version {min_version.name} or later!")
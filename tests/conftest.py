@@ -0,0 +1,53 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import os
+import shutil
+import subprocess
+import sys
+from typing import Callable, Iterable
+
+import pytest
+
+from .rdc_helpers import RDCSectionSpec, build_rdc
+
+STUB_RENDERDOC_SOURCE = os.path.join(os.path.dirname(__file__), "stub_renderdoc.c")
+
+
+@pytest.fixture
+def make_rdc(tmp_path) -> Callable[..., str]:
+    """
+    Builds a capture file in a temporary directory and returns its path.
+    """
+    def make(name: str, sections: Iterable[RDCSectionSpec], thumbnail: bytes = b"") -> str:
+        path = str(tmp_path / name)
+        build_rdc(path, sections, thumbnail)
+        return path
+    return make
+
+
+def _build_stub_renderdoc(directory, max_version: int = 10600) -> str:
+    compiler = shutil.which("cc") or shutil.which("gcc") or shutil.which("clang")
+    if compiler is None or sys.platform.startswith("win32"):
+        pytest.skip("A C compiler is needed to build the stand-in RenderDoc library")
+    path = str(directory / f"librenderdoc_stub_{max_version}.so")
+    flags = ["-dynamiclib"] if sys.platform == "darwin" else ["-shared", "-fPIC"]
+    subprocess.run([compiler, *flags, f"-DMAX_API_VERSION={max_version}", "-o", path, STUB_RENDERDOC_SOURCE],
+                   check=True)
+    return path
+
+
+@pytest.fixture(scope="session")
+def stub_renderdoc(tmp_path_factory) -> str:
+    """
+    Compiles the stand-in RenderDoc library and returns its path.
+    """
+    return _build_stub_renderdoc(tmp_path_factory.mktemp("renderdoc"))
+
+
+@pytest.fixture(scope="session")
+def stub_renderdoc_1_4(tmp_path_factory) -> str:
+    """
+    Compiles a stand-in RenderDoc library which only supports API versions up to 1.4.2 and returns its path.
+    """
+    return _build_stub_renderdoc(tmp_path_factory.mktemp("renderdoc"), 10402)
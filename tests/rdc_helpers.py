@@ -0,0 +1,30 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import struct
+from typing import Iterable, Tuple
+
+from pyRenderdocApp.rdc_file import RDC_MAGIC, encode_rdc_section
+
+RDCSectionSpec = Tuple[int, str, bytes]
+
+
+def encode_rdc_chunk(chunk_id: int, data: bytes) -> bytes:
+    """
+    Encodes a chunk with no optional fields and a 32-bit length.
+    """
+    return struct.pack("<II", chunk_id, len(data)) + data
+
+
+def build_rdc(path: str, sections: Iterable[RDCSectionSpec], thumbnail: bytes = b"") -> None:
+    """
+    Writes a minimal capture file with the given sections, each a tuple of (type, name, data).
+    """
+    driver_name = b"Vulkan"
+    header_rest = (struct.pack("<HHI", 1, 1, len(thumbnail)) + thumbnail
+                   + struct.pack("<QB", 1, len(driver_name)) + driver_name)
+    header = struct.pack("<QII16s", RDC_MAGIC, 0x102, 32 + len(header_rest), b"v1.30") + header_rest
+    with open(path, "wb") as f:
+        f.write(header)
+        for section_type, name, data in sections:
+            f.write(encode_rdc_section(section_type, name, data))
@@ -0,0 +1,102 @@
+/*
+ * Copyright (c) 2024 Thomas Mathieson.
+ * Distributed under the terms of the MIT license.
+ *
+ * A stand-in for the RenderDoc in-app library, used by the tests. It implements the API v1.6.0 function table, every
+ * capture writes a small file named after the capture file path template. Define MAX_API_VERSION to build a library
+ * which only supports older API versions.
+ */
+#include <errno.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <string.h>
+#include <sys/stat.h>
+#include <time.h>
+
+#ifndef MAX_API_VERSION
+#define MAX_API_VERSION 10600
+#endif
+
+#define MAX_CAPTURES 64
+#define MAX_PATH_LEN 512
+
+static char path_template[MAX_PATH_LEN] = "capture";
+static char captures[MAX_CAPTURES][MAX_PATH_LEN + 32];
+static uint64_t timestamps[MAX_CAPTURES];
+static uint32_t options[32];
+static int capturing = 0, num_captures = 0, frame = 0;
+
+static void make_parent_dirs(const char *path) {
+    char dir[MAX_PATH_LEN + 32];
+    char *p;
+    strncpy(dir, path, sizeof(dir) - 1);
+    dir[sizeof(dir) - 1] = 0;
+    for (p = dir + 1; *p; p++) {
+        if (*p == '/') {
+            *p = 0;
+            if (mkdir(dir, 0777) != 0 && errno != EEXIST)
+                return;
+            *p = '/';
+        }
+    }
+}
+
+static void GetAPIVersion(int *major, int *minor, int *patch) {
+    *major = MAX_API_VERSION / 10000;
+    *minor = MAX_API_VERSION / 100 % 100;
+    *patch = MAX_API_VERSION % 100;
+}
+static int SetCaptureOptionU32(int opt, uint32_t val) { if (opt < 0 || opt >= 32) return 0; options[opt] = val; return 1; }
+static int SetCaptureOptionF32(int opt, float val) { return opt >= 0 && opt < 32; }
+static uint32_t GetCaptureOptionU32(int opt) { return opt >= 0 && opt < 32 ? options[opt] : 0xffffffff; }
+static float GetCaptureOptionF32(int opt) { return 0.0f; }
+static void SetKeys(int *keys, int num) {}
+static uint32_t GetOverlayBits(void) { return 0; }
+static void MaskOverlayBits(uint32_t and_mask, uint32_t or_mask) {}
+static void Nop(void) {}
+static void SetCaptureFilePathTemplate(const char *t) { if (t && *t) strncpy(path_template, t, MAX_PATH_LEN - 1); }
+static const char *GetCaptureFilePathTemplate(void) { return path_template; }
+static uint32_t GetNumCaptures(void) { return num_captures; }
+static uint32_t GetCapture(uint32_t idx, char *filename, uint32_t *path_length, uint64_t *timestamp) {
+    if (idx >= (uint32_t)num_captures) return 0;
+    if (filename) strcpy(filename, captures[idx]);
+    if (path_length) *path_length = (uint32_t)strlen(captures[idx]) + 1;
+    if (timestamp) *timestamp = timestamps[idx];
+    return 1;
+}
+static uint32_t ReturnZero(void) { return 0; }
+static uint32_t LaunchReplayUI(uint32_t connect, const char *cmdline) { return 0; }
+static void SetActiveWindow(void *device, void *wnd) {}
+static void StartFrameCapture(void *device, void *wnd) { capturing = 1; }
+static uint32_t IsFrameCapturing(void) { return capturing; }
+static uint32_t EndFrameCapture(void *device, void *wnd) {
+    FILE *f;
+    if (!capturing || num_captures >= MAX_CAPTURES) return 0;
+    capturing = 0;
+    snprintf(captures[num_captures], sizeof(captures[0]), "%s_frame%d.rdc", path_template, frame++);
+    make_parent_dirs(captures[num_captures]);
+    f = fopen(captures[num_captures], "wb");
+    if (!f) return 0;
+    fwrite("RDOC\0\0\0\0", 1, 8, f);
+    fclose(f);
+    timestamps[num_captures++] = (uint64_t)time(NULL);
+    return 1;
+}
+static void TriggerMultiFrameCapture(uint32_t num_frames) {}
+static void SetCaptureFileComments(const char *path, const char *comments) {}
+static uint32_t DiscardFrameCapture(void *device, void *wnd) { int was = capturing; capturing = 0; return was; }
+static void SetCaptureTitle(const char *title) {}
+
+static void *api_table[] = {
+    GetAPIVersion, SetCaptureOptionU32, SetCaptureOptionF32, GetCaptureOptionU32, GetCaptureOptionF32,
+    SetKeys, SetKeys, GetOverlayBits, MaskOverlayBits, Nop, Nop,
+    SetCaptureFilePathTemplate, GetCaptureFilePathTemplate, GetNumCaptures, GetCapture, Nop,
+    ReturnZero, LaunchReplayUI, SetActiveWindow, StartFrameCapture, IsFrameCapturing, EndFrameCapture,
+    TriggerMultiFrameCapture, SetCaptureFileComments, DiscardFrameCapture, ReturnZero, SetCaptureTitle,
+};
+
+int RENDERDOC_GetAPI(int version, void **out_api) {
+    if (version < 10000 || version > MAX_API_VERSION) return 0;
+    *out_api = api_table;
+    return 1;
+}
@@ -0,0 +1,114 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGET_SCRIPT = """
+import sys
+
+def setup(args):
+    if "--fail" in args:
+        raise RuntimeError("setup failed")
+    if "--exit" in args:
+        sys.exit(2)
+
+def render_frame(frame):
+    print("rendering", frame)
+"""
+
+
+@pytest.fixture
+def manifest(tmp_path) -> str:
+    (tmp_path / "scene.py").write_text(TARGET_SCRIPT)
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps({
+        "output_dir": "captures",
+        "jobs": [
+            {"name": "forest", "script": "scene.py", "frames": [1, 2]},
+            {"name": "desert", "script": "scene.py", "frames": 0},
+            {"name": "broken", "script": "scene.py", "frames": 0, "args": ["--fail"]},
+        ]
+    }))
+    return str(path)
+
+
+def run_cli(*args: str) -> "subprocess.CompletedProcess[bytes]":
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (REPO_ROOT, os.environ.get("PYTHONPATH")))))
+    return subprocess.run([sys.executable, "-m", "pyRenderdocApp", *args], stdout=subprocess.PIPE, env=env,
+                          timeout=120)
+
+
+def test_batch_summary(manifest, stub_renderdoc, tmp_path):
+    process = run_cli(manifest, "--jobs", "2", "--renderdoc-path", stub_renderdoc)
+    summary = json.loads(process.stdout)
+
+    assert process.returncode == 1
+    assert summary["succeeded"] == 2
+    assert summary["failed"] == 1
+    forest, desert, broken = summary["jobs"]
+
+    assert forest["error"] is None
+    assert len(forest["captures"]) == 2
+    assert len(forest["frame_times"]) == 2
+    for capture in forest["captures"]:
+        assert os.path.dirname(capture["path"]) == str(tmp_path / "captures" / "forest")
+        assert capture["size"] == 8
+    assert len(desert["captures"]) == 1
+
+    assert "setup failed" in broken["error"]
+    assert broken["captures"] == []
+    assert broken["setup_time"] is not None
+
+
+def test_batch_success_exit_code(manifest, stub_renderdoc, tmp_path):
+    with open(manifest, "r", encoding="utf-8") as f:
+        jobs = json.load(f)
+    jobs["jobs"].pop()
+    with open(manifest, "w", encoding="utf-8") as f:
+        json.dump(jobs, f)
+    output = tmp_path / "summary.json"
+
+    process = run_cli(manifest, "--renderdoc-path", stub_renderdoc, "--output-dir", str(tmp_path / "out"),
+                      "-o", str(output))
+    summary = json.loads(output.read_text())
+
+    assert process.returncode == 0
+    assert summary["failed"] == 0
+    assert [len(job["captures"]) for job in summary["jobs"]] == [2, 1]
+    assert os.path.exists(summary["jobs"][0]["captures"][0]["path"])
+    assert summary["jobs"][0]["captures"][0]["path"].startswith(str(tmp_path / "out"))
+
+
+def test_batch_broken_pool(manifest):
+    process = run_cli(manifest, "--renderdoc-path", "/nonexistent/librenderdoc.so")
+    summary = json.loads(process.stdout)
+
+    assert process.returncode == 1
+    assert summary["succeeded"] == 0
+    assert summary["failed"] == 3
+    assert all("BrokenProcessPool" in job["error"] for job in summary["jobs"])
+
+
+def test_batch_script_exits(manifest, stub_renderdoc):
+    with open(manifest, "r", encoding="utf-8") as f:
+        jobs = json.load(f)
+    jobs["jobs"] = [jobs["jobs"][0], {"name": "exits", "script": "scene.py", "frames": 0, "args": ["--exit"]}]
+    with open(manifest, "w", encoding="utf-8") as f:
+        json.dump(jobs, f)
+
+    process = run_cli(manifest, "--renderdoc-path", stub_renderdoc)
+    summary = json.loads(process.stdout)
+
+    assert process.returncode == 1
+    assert summary["succeeded"] == 1
+    assert summary["failed"] == 1
+    assert len(summary["jobs"][0]["captures"]) == 2
+    assert "SystemExit" in summary["jobs"][1]["error"]
+    assert summary["jobs"][1]["setup_time"] is not None
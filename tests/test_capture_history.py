@@ -0,0 +1,110 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import os
+import tempfile
+from ctypes import CDLL
+
+import pytest
+
+from pyRenderdocApp import get_render_doc_api
+from pyRenderdocApp.capture_history import TRACKED_OPTIONS, CaptureHistory, capture_profile
+from pyRenderdocApp.renderdoc_enums import RENDERDOC_CaptureOption
+
+VALIDATION = RENDERDOC_CaptureOption.eRENDERDOC_Option_APIValidation
+CALLSTACKS = RENDERDOC_CaptureOption.eRENDERDOC_Option_CaptureCallstacks
+REF_ALL = RENDERDOC_CaptureOption.eRENDERDOC_Option_RefAllResources
+
+
+def test_capture_profile():
+    assert capture_profile({}) == 0
+    assert capture_profile({VALIDATION: 1, CALLSTACKS: 0}) == 1
+    assert capture_profile({option: 1 for option in TRACKED_OPTIONS}) == (1 << len(TRACKED_OPTIONS)) - 1
+    # Options which don't affect the cost of a capture are ignored
+    assert capture_profile({RENDERDOC_CaptureOption.eRENDERDOC_Option_DelayForDebugger: 5}) == 0
+
+
+def test_record_and_reload(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = CaptureHistory(path)
+    assert history.estimate_capture_cost({}) is None
+
+    history.record({}, 0.1, 1000)
+    history.record({}, 0.3, 3000)
+    history.record({VALIDATION: 1}, 1.0, 50000)
+    with open(path, "ab") as f:
+        # A record which was only partly written is ignored
+        f.write(b"\0" * 5)
+
+    for h in (history, CaptureHistory(path)):
+        assert sorted(h.profiles) == [0, 1]
+        cost = h.estimate_capture_cost({})
+        assert cost.exact
+        assert cost.samples == 2
+        assert cost.stall_seconds == pytest.approx(0.2)
+        assert cost.size_bytes == pytest.approx(2000)
+        assert cost.size_bytes_stddev == pytest.approx(1414.2135, rel=1e-4)
+
+
+def test_estimate_from_closest_profile(tmp_path):
+    history = CaptureHistory(str(tmp_path / "history.bin"))
+    history.record({VALIDATION: 1}, 1.0, 10)
+    history.record({CALLSTACKS: 1, REF_ALL: 1}, 2.0, 20)
+    history.record({CALLSTACKS: 1, REF_ALL: 1}, 2.0, 20)
+
+    # Differs from the first profile by two options and from the second by one
+    cost = history.estimate_capture_cost({CALLSTACKS: 1})
+    assert not cost.exact
+    assert cost.size_bytes == 20
+    # Equally close to both, the profile with more samples wins
+    cost = history.estimate_capture_cost({VALIDATION: 1, CALLSTACKS: 1, REF_ALL: 1})
+    assert cost.size_bytes == 20
+    assert history.estimate_capture_cost({VALIDATION: 1}).exact
+
+
+def test_existing_empty_file(tmp_path):
+    fd, path = tempfile.mkstemp(dir=str(tmp_path))
+    os.close(fd)
+
+    CaptureHistory(path).record({}, 0.5, 100)
+
+    assert CaptureHistory(path).estimate_capture_cost({}).samples == 1
+
+
+def test_not_a_history_file(tmp_path):
+    path = tmp_path / "history.bin"
+    path.write_bytes(b"not a history file")
+
+    with pytest.raises(ValueError):
+        CaptureHistory(str(path))
+
+
+def test_api_records_captures(stub_renderdoc, tmp_path):
+    api = get_render_doc_api(CDLL(stub_renderdoc))
+    api.set_capture_file_path_template(str(tmp_path / "capture"))
+    for option in TRACKED_OPTIONS:
+        api.set_capture_option_u32(option, 0)
+    api.set_capture_option_u32(VALIDATION, 1)
+    history = CaptureHistory(str(tmp_path / "history.bin"))
+    assert api.estimate_capture_cost() is None
+
+    api.set_capture_history(history)
+    assert api.estimate_capture_cost() is None
+    try:
+        api.start_frame_capture(None, None)
+        api.end_frame_capture(None, None)
+    finally:
+        api.set_capture_history(None)
+        api.set_capture_option_u32(VALIDATION, 0)
+
+    assert history.profiles == [1]
+    cost = history.estimate_capture_cost({VALIDATION: 1})
+    assert cost.exact
+    # The stand-in library writes 8 byte captures
+    assert cost.size_bytes == 8
+    api.set_capture_history(history)
+    try:
+        assert api.estimate_capture_cost({VALIDATION: 1}).exact
+        assert not api.estimate_capture_cost().exact
+    finally:
+        api.set_capture_history(None)
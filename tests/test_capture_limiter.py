@@ -0,0 +1,150 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from pyRenderdocApp import capture_limiter
+from pyRenderdocApp.capture_limiter import CaptureRateLimiter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(capture_limiter.time, "monotonic", clock)
+    return clock
+
+
+def run_limiter(state_dir: str, code: str) -> str:
+    """
+    Runs ``code`` in a new Python process with a limiter named ``lim`` sharing the test's state.
+    """
+    script = (f"from pyRenderdocApp.capture_limiter import CaptureRateLimiter\n"
+              f"lim = CaptureRateLimiter('test', state_dir={state_dir!r})\n{code}")
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    return subprocess.run([sys.executable, "-c", script], stdout=subprocess.PIPE, env=env, check=True,
+                          timeout=60).stdout.decode().strip()
+
+
+def test_byte_bucket(tmp_path, clock):
+    limiter = CaptureRateLimiter("test", bytes_per_second=1000, state_dir=str(tmp_path))
+
+    # A capture may start while the bucket isn't in debt, however large it is
+    assert limiter.try_consume(1500)
+    assert not limiter.try_consume(1)
+    assert not limiter.try_acquire()
+
+    clock.now += 0.4
+    assert not limiter.try_acquire()
+    clock.now += 0.2
+    assert limiter.try_acquire()
+    limiter.release(2000)
+    assert limiter.last_capture_bytes == 2000
+
+    clock.now += 1.0
+    assert not limiter.try_consume()
+    # The bucket never refills past the burst size
+    clock.now += 100.0
+    assert limiter.try_consume()
+    assert not limiter.try_consume()
+
+
+def test_max_concurrent(tmp_path):
+    limiter = CaptureRateLimiter("test", max_concurrent=2, state_dir=str(tmp_path))
+
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    limiter.release()
+    assert limiter.try_acquire()
+    limiter.release()
+    limiter.release()
+
+
+def test_unavailable_state(tmp_path):
+    not_a_dir = tmp_path / "file"
+    not_a_dir.write_bytes(b"")
+
+    fail_open = CaptureRateLimiter("test", state_dir=str(not_a_dir))
+    fail_closed = CaptureRateLimiter("test", state_dir=str(not_a_dir), fail_open=False)
+
+    assert not fail_open.available
+    assert fail_open.try_acquire()
+    assert fail_open.try_consume()
+    fail_open.release()
+    assert not fail_closed.available
+    assert not fail_closed.try_acquire()
+    assert not fail_closed.try_consume()
+
+
+def test_reap_dead_process(tmp_path):
+    limiter = CaptureRateLimiter("test", state_dir=str(tmp_path))
+
+    # The other process exits while holding the only slot
+    assert run_limiter(str(tmp_path), "print(lim.try_acquire())") == "True"
+
+    assert limiter.try_acquire()
+    limiter.release()
+
+
+def test_exclusion_between_processes(tmp_path):
+    limiter = CaptureRateLimiter("test", state_dir=str(tmp_path))
+
+    assert limiter.try_acquire()
+    assert run_limiter(str(tmp_path), "print(lim.try_acquire())") == "False"
+    limiter.release()
+
+    # While the state is locked by this process, the other process can't update it at all
+    assert limiter._lock()
+    try:
+        assert run_limiter(str(tmp_path), "print(lim.try_acquire(), lim.try_consume())") == "False False"
+    finally:
+        limiter._unlock()
+    assert run_limiter(str(tmp_path), "print(lim.try_acquire())") == "True"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requires os.fork()")
+def test_exclusion_after_fork(tmp_path):
+    limiter = CaptureRateLimiter("test", state_dir=str(tmp_path))
+
+    assert limiter._lock()
+    try:
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if not limiter.try_consume() else 1)
+        _, status = os.waitpid(pid, 0)
+    finally:
+        limiter._unlock()
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+
+def test_exclusion_between_threads(tmp_path):
+    limiter = CaptureRateLimiter("test", state_dir=str(tmp_path))
+    results = []
+
+    assert limiter._lock()
+    try:
+        thread = threading.Thread(target=lambda: results.append(limiter.try_acquire()))
+        thread.start()
+        thread.join(0.2)
+        # The other thread waits for this one, rather than sharing its file lock
+        assert thread.is_alive()
+    finally:
+        limiter._unlock()
+    thread.join()
+    assert results == [True]
+    limiter.release()
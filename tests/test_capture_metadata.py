@@ -0,0 +1,92 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import os
+
+import pytest
+
+from pyRenderdocApp.capture_metadata import (NOTES_SECTION_NAME, read_capture_metadata, read_capture_notes,
+                                             set_capture_metadata, set_capture_metadata_batch)
+from pyRenderdocApp.rdc_file import RDCSectionType, encode_rdc_section, iter_rdc_sections
+
+FRAME = RDCSectionType.eSectionType_FrameCapture.value
+NOTES = RDCSectionType.eSectionType_Notes.value
+FRAME_DATA = b"\x01\x00\x00\x00\x03\x00\x00\x00abc"
+
+
+def read_sections(path):
+    with open(path, "rb") as f:
+        return list(iter_rdc_sections(f))
+
+
+def test_add_metadata_without_notes(make_rdc):
+    path = make_rdc("a.rdc", [(FRAME, "renderdoc/internal/framecapture", FRAME_DATA)])
+    size = os.path.getsize(path)
+
+    set_capture_metadata(path, "nightly build", {"build": 123})
+
+    assert read_capture_notes(path)["comments"] == "nightly build"
+    assert read_capture_metadata(path) == {"build": 123}
+    sections = read_sections(path)
+    assert [s.section_type for s in sections] == [FRAME, NOTES]
+    # The existing sections are untouched, the notes are appended
+    assert sections[1].offset == size
+
+
+def test_patch_trailing_notes(make_rdc):
+    path = make_rdc("a.rdc", [(FRAME, "renderdoc/internal/framecapture", FRAME_DATA),
+                              (NOTES, NOTES_SECTION_NAME, b'{"comments": "old"}')])
+
+    set_capture_metadata(path, metadata={"ci": "job-1"})
+    set_capture_metadata(path, metadata={"build": 7})
+
+    assert read_capture_notes(path)["comments"] == "old"
+    assert read_capture_metadata(path) == {"ci": "job-1", "build": 7}
+    # Trailing notes are never overwritten, each patch appends new notes and hides the old ones
+    unknown = RDCSectionType.eSectionType_Unknown.value
+    assert [s.section_type for s in read_sections(path)] == [FRAME, unknown, unknown, NOTES]
+
+
+@pytest.mark.parametrize("torn_length", [30, -5])
+def test_patch_after_interrupted_patch(make_rdc, torn_length):
+    path = make_rdc("a.rdc", [(FRAME, "renderdoc/internal/framecapture", FRAME_DATA),
+                              (NOTES, NOTES_SECTION_NAME, b'{"comments": "old"}')])
+    with open(path, "ab") as f:
+        # A torn notes section, as left by a patch which was interrupted while appending
+        f.write(encode_rdc_section(NOTES, NOTES_SECTION_NAME, b'{"comments": "torn"}')[:torn_length])
+    assert read_capture_notes(path)["comments"] == "old"
+
+    set_capture_metadata(path, "new")
+
+    assert read_capture_notes(path)["comments"] == "new"
+    assert [s.section_type for s in read_sections(path)] == [FRAME, RDCSectionType.eSectionType_Unknown.value, NOTES]
+
+
+def test_relabel_notes_in_middle(make_rdc):
+    path = make_rdc("a.rdc", [(FRAME, "renderdoc/internal/framecapture", FRAME_DATA),
+                              (NOTES, NOTES_SECTION_NAME, b'{"comments": "old"}'),
+                              (RDCSectionType.eSectionType_Bookmarks.value, "renderdoc/ui/bookmarks", b"[]")])
+
+    set_capture_metadata(path, "new", {"build": 1})
+
+    sections = read_sections(path)
+    assert [s.section_type for s in sections] == [FRAME, RDCSectionType.eSectionType_Unknown.value,
+                                                  RDCSectionType.eSectionType_Bookmarks.value, NOTES]
+    # The old section keeps its size so the file layout stays valid, but is no longer found as notes
+    assert sections[1].name != NOTES_SECTION_NAME
+    assert sections[1].data_offset - sections[1].offset == 40 + len(NOTES_SECTION_NAME) + 1
+    assert read_capture_notes(path) == {"comments": "new", "pyRenderdocApp": {"build": 1}}
+
+
+def test_batch(make_rdc):
+    paths = [make_rdc(f"{i}.rdc", [(FRAME, "renderdoc/internal/framecapture", FRAME_DATA)]) for i in range(4)]
+    bad = make_rdc("bad.rdc", [])
+    with open(bad, "wb") as f:
+        f.write(b"not a capture")
+
+    errors = set_capture_metadata_batch([(p, None, {"index": i}) for i, p in enumerate(paths)]
+                                        + [(bad, "x", None)], max_workers=2)
+
+    assert errors[:4] == [None] * 4
+    assert isinstance(errors[4], ValueError)
+    assert [read_capture_metadata(p)["index"] for p in paths] == [0, 1, 2, 3]
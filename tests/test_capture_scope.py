@@ -0,0 +1,81 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+from ctypes import CDLL
+
+import pytest
+
+from pyRenderdocApp import get_render_doc_api
+from pyRenderdocApp import capture_scope
+from pyRenderdocApp.capture_limiter import CaptureRateLimiter
+from pyRenderdocApp.capture_scope import CaptureScope
+
+
+@pytest.fixture
+def api(stub_renderdoc, tmp_path):
+    api = get_render_doc_api(CDLL(stub_renderdoc))
+    api.set_capture_file_path_template(str(tmp_path / "capture"))
+    yield api
+    api.set_capture_limiter(None)
+    if api.is_frame_capturing():
+        api.discard_frame_capture(None, None)
+
+
+def test_scope_captures_when_armed(api):
+    scope = CaptureScope(api)
+    first_capture = api.get_num_captures()
+    with scope:
+        assert not api.is_frame_capturing()
+    scope.arm()
+    with scope:
+        with scope:
+            assert api.is_frame_capturing()
+        assert api.is_frame_capturing()
+    assert not api.is_frame_capturing()
+    assert not scope.armed
+    assert api.get_num_captures() == first_capture + 1
+
+
+def test_scope_doesnt_overlap_outside_capture(api):
+    scope = CaptureScope(api)
+    scope.arm()
+    api.start_frame_capture(None, None)
+    with scope:
+        pass
+    assert api.is_frame_capturing()
+    assert scope.armed
+    assert capture_scope._active_scope is None
+
+
+def test_scope_title_error_ends_capture(api):
+    def title() -> str:
+        raise KeyError("title")
+
+    scope = CaptureScope(api, title=title)
+    scope.arm()
+    with pytest.raises(KeyError):
+        with scope:
+            pass
+    assert not api.is_frame_capturing()
+    assert capture_scope._active_scope is None
+    assert scope.armed
+
+
+def test_scope_limiter_refused(api, tmp_path):
+    limiter = CaptureRateLimiter("scope", state_dir=str(tmp_path))
+    api.set_capture_limiter(limiter)
+    assert limiter.try_acquire()
+    scope = CaptureScope(api)
+    scope.arm()
+    try:
+        with scope:
+            assert not api.is_frame_capturing()
+    finally:
+        limiter.release()
+    assert scope.armed
+    with scope:
+        assert api.is_frame_capturing()
+    assert not scope.armed
+    # The scope's slot was released, so another capture can start
+    assert limiter.try_acquire()
+    limiter.release()
@@ -0,0 +1,203 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import hashlib
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import pytest
+
+from pyRenderdocApp.capture_upload import CaptureUploader, sign_v4
+
+MIB = 1024 * 1024
+ACCESS_KEY = "AKIDEXAMPLE"
+SECRET_KEY = "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY"
+
+
+class FakeS3Handler(BaseHTTPRequestHandler):
+    """
+    Implements just enough of the S3 multipart upload API for the tests, checking every request's signature.
+    """
+    protocol_version = "HTTP/1.1"
+    server: "FakeS3Server"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_request(self):
+        url = urlsplit(self.path)
+        query = dict(parse_qsl(url.query, keep_blank_values=True))
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        payload_hash = self.headers["x-amz-content-sha256"]
+        assert payload_hash == hashlib.sha256(body).hexdigest()
+        signed = {name: self.headers[name] for name in ("x-amz-content-sha256", "x-amz-date")}
+        expected = sign_v4(self.command, self.headers["Host"], url.path, query, signed, payload_hash,
+                           ACCESS_KEY, SECRET_KEY, "us-east-1", self.headers["x-amz-date"])
+        assert self.headers["Authorization"] == expected
+        return unquote(url.path), query, body
+
+    def do_POST(self) -> None:
+        path, query, body = self._read_request()
+        server = self.server
+        if "uploads" in query:
+            with server.lock:
+                server.next_upload += 1
+                upload_id = f"upload-{server.next_upload}"
+                server.uploads[upload_id] = {}
+            self._send(200, f"<InitiateMultipartUploadResult xmlns=\"http://s3.amazonaws.com/doc/2006-03-01/\">"
+                            f"<UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>".encode())
+            return
+        parts = server.uploads.pop(query["uploadId"], None)
+        if parts is None:
+            self._send(404, b"<Error><Code>NoSuchUpload</Code></Error>")
+            return
+        numbers = [int(n) for n in re.findall(r"<PartNumber>(\d+)</PartNumber>", body.decode())]
+        server.objects[path] = b"".join(parts[n] for n in numbers)
+        self._send(200, b"<CompleteMultipartUploadResult xmlns=\"http://s3.amazonaws.com/doc/2006-03-01/\">"
+                        b"<ETag>\"complete\"</ETag></CompleteMultipartUploadResult>")
+
+    def do_PUT(self) -> None:
+        _, query, body = self._read_request()
+        server = self.server
+        number = int(query["partNumber"])
+        parts = server.uploads.get(query["uploadId"])
+        if parts is None:
+            self._send(404, b"<Error><Code>NoSuchUpload</Code></Error>")
+            return
+        with server.lock:
+            if server.fail_part == number:
+                server.fail_part = None
+                self._send(403, b"<Error><Code>AccessDenied</Code></Error>")
+                return
+        parts[number] = body
+        self._send(200, headers={"ETag": f"\"{hashlib.md5(body).hexdigest()}\""})
+
+
+    def do_DELETE(self) -> None:
+        _, query, _ = self._read_request()
+        server = self.server
+        if server.uploads.pop(query["uploadId"], None) is None:
+            self._send(404, b"<Error><Code>NoSuchUpload</Code></Error>")
+            return
+        server.aborted.append(query["uploadId"])
+        self._send(204)
+
+
+class FakeS3Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeS3Handler)
+        self.lock = threading.Lock()
+        self.next_upload = 0
+        self.uploads: Dict[str, Dict[int, bytes]] = {}
+        self.objects: Dict[str, bytes] = {}
+        self.aborted: List[str] = []
+        self.fail_part: Optional[int] = None
+
+
+@pytest.fixture
+def s3_server():
+    server = FakeS3Server()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def uploader(s3_server) -> CaptureUploader:
+    return CaptureUploader(f"http://127.0.0.1:{s3_server.server_port}", "captures", prefix="node/",
+                           access_key=ACCESS_KEY, secret_key=SECRET_KEY, part_size=5 * MIB, max_concurrency=2)
+
+
+@pytest.fixture
+def capture_file(tmp_path):
+    data = os.urandom(12 * MIB + 123)
+    path = tmp_path / "frame.rdc"
+    path.write_bytes(data)
+    return str(path), data
+
+
+def test_multipart_upload(s3_server, uploader, capture_file):
+    path, data = capture_file
+    result = uploader.upload_file(path)
+
+    assert result.key == "node/frame.rdc"
+    assert result.size == len(data)
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
+    assert result.resumed_parts == 0
+    assert s3_server.objects["/captures/node/frame.rdc"] == data
+    assert not os.path.exists(path + ".upload.json")
+
+
+def test_resume_after_failed_part(s3_server, uploader, capture_file):
+    path, data = capture_file
+    s3_server.fail_part = 2
+    with pytest.raises(OSError):
+        uploader.upload_file(path)
+    assert os.path.exists(path + ".upload.json")
+
+    result = uploader.upload_file(path)
+
+    assert result.resumed_parts >= 1
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
+    assert s3_server.objects["/captures/node/frame.rdc"] == data
+    assert s3_server.next_upload == 1
+    assert not os.path.exists(path + ".upload.json")
+
+
+def test_restart_after_upload_expired(s3_server, uploader, capture_file):
+    path, data = capture_file
+    s3_server.fail_part = 2
+    with pytest.raises(OSError):
+        uploader.upload_file(path)
+    s3_server.uploads.clear()
+
+    result = uploader.upload_file(path)
+
+    assert result.resumed_parts == 0
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
+    assert s3_server.objects["/captures/node/frame.rdc"] == data
+    assert s3_server.next_upload == 2
+
+
+@pytest.mark.parametrize("change", ["file", "key"])
+def test_abort_outdated_upload(s3_server, uploader, capture_file, change):
+    path, data = capture_file
+    s3_server.fail_part = 2
+    with pytest.raises(OSError):
+        uploader.upload_file(path)
+    key = None
+    if change == "file":
+        data += b"more frames"
+        with open(path, "ab") as f:
+            f.write(b"more frames")
+    else:
+        key = "node/renamed.rdc"
+
+    result = uploader.upload_file(path, key)
+
+    assert s3_server.aborted == ["upload-1"]
+    assert s3_server.uploads == {}
+    assert result.resumed_parts == 0
+    assert s3_server.objects["/captures/" + result.key] == data
+
+
+def test_signed_host_omits_default_port():
+    assert CaptureUploader("https://s3.example.com:443", "captures")._host == "s3.example.com"
+    assert CaptureUploader("http://s3.example.com:80", "captures")._host == "s3.example.com"
+    assert CaptureUploader("http://127.0.0.1:9000", "captures")._host == "127.0.0.1:9000"
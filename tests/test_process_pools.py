@@ -0,0 +1,73 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from ctypes import CDLL
+from typing import Tuple
+
+import pytest
+
+import pyRenderdocApp
+from pyRenderdocApp import get_render_doc_api, get_worker_render_doc, init_render_doc_worker
+from pyRenderdocApp.capture_limiter import CaptureRateLimiter
+
+
+def describe_api(api) -> Tuple[str, str, Tuple[int, int, int]]:
+    return type(api).__name__, api.library_path, api.get_api_version()
+
+
+def describe_worker_api() -> Tuple[str, str, Tuple[int, int, int]]:
+    return describe_api(get_worker_render_doc())
+
+
+def test_unpickle_in_spawned_process(stub_renderdoc):
+    api = get_render_doc_api(CDLL(stub_renderdoc))
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        assert executor.submit(describe_api, api).result() == ("RENDERDOC_API_1_6_0", stub_renderdoc, (1, 6, 0))
+
+
+def test_worker_initializer(stub_renderdoc):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=init_render_doc_worker, initargs=(stub_renderdoc,)) as executor:
+        assert executor.submit(describe_worker_api).result() == ("RENDERDOC_API_1_6_0", stub_renderdoc, (1, 6, 0))
+
+
+def test_worker_api_not_loaded(stub_renderdoc, monkeypatch):
+    monkeypatch.setattr(pyRenderdocApp, "_worker_api", None)
+    with pytest.raises(RuntimeError):
+        get_worker_render_doc()
+
+    init_render_doc_worker(stub_renderdoc)
+
+    assert describe_api(get_worker_render_doc()) == ("RENDERDOC_API_1_6_0", stub_renderdoc, (1, 6, 0))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requires os.fork()")
+def test_fork_with_limiter_slot_held(stub_renderdoc, tmp_path):
+    api = get_render_doc_api(CDLL(stub_renderdoc))
+    api.set_capture_file_path_template(str(tmp_path / "capture"))
+    limiter = CaptureRateLimiter("fork", state_dir=str(tmp_path))
+    api.set_capture_limiter(limiter)
+    assert api.start_frame_capture(None, None)
+    read_fd, write_fd = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            result = (api._limiter_slots, limiter._pid == os.getpid(), limiter.available,
+                      api.start_frame_capture(None, None), api.get_api_version())
+            os.write(write_fd, pickle.dumps(result))
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as f:
+        result = pickle.loads(f.read())
+    os.waitpid(pid, 0)
+    api.end_frame_capture(None, None)
+    api.set_capture_limiter(None)
+
+    # The child holds no slots, has its own handle on the shared state, and still sees the parent's slot as taken
+    assert result == (0, True, True, False, (1, 6, 0))
@@ -0,0 +1,68 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+from pyRenderdocApp.rdc_diff import captures_differ, captures_differ_many, diff_captures
+from pyRenderdocApp.rdc_file import RDCSectionType
+
+from .rdc_helpers import encode_rdc_chunk
+
+FRAME = RDCSectionType.eSectionType_FrameCapture.value
+NOTES = RDCSectionType.eSectionType_Notes.value
+
+
+def frame_capture(*chunks):
+    return FRAME, "renderdoc/internal/framecapture", b"".join(encode_rdc_chunk(c, d) for c, d in chunks)
+
+
+def test_identical_captures(make_rdc):
+    sections = [frame_capture((1, b"abc"), (2, b"defg")), (NOTES, "renderdoc/ui/notes", b"{}")]
+    a = make_rdc("a.rdc", sections)
+    b = make_rdc("b.rdc", sections, thumbnail=b"different thumbnail")
+
+    assert not captures_differ(a, b)
+    diff = diff_captures(a, b)
+    assert diff.identical
+    assert diff.sections == []
+
+
+def test_changed_section_data(make_rdc):
+    a = make_rdc("a.rdc", [frame_capture((1, b"abc"), (2, b"defg"))])
+    b = make_rdc("b.rdc", [frame_capture((1, b"abc"), (2, b"defh"))])
+
+    assert captures_differ(a, b)
+    # Same section table, only the data differs
+    assert not captures_differ(a, b, compare_data=False)
+
+    diff = diff_captures(a, b)
+    assert not diff.identical
+    assert len(diff.sections) == 1
+    section = diff.sections[0]
+    assert section.a.digest != section.b.digest
+    assert section.a.chunk_histogram == section.b.chunk_histogram == {1: 1, 2: 1}
+
+
+def test_changed_chunk_histogram(make_rdc):
+    a = make_rdc("a.rdc", [frame_capture((1, b"ab"), (2, b"cd"))])
+    b = make_rdc("b.rdc", [frame_capture((1, b"ab"), (1, b"cd"))])
+
+    diff = diff_captures(a, b)
+    assert diff.sections[0].a.chunk_histogram == {1: 1, 2: 1}
+    assert diff.sections[0].b.chunk_histogram == {1: 2}
+
+
+def test_missing_section(make_rdc):
+    a = make_rdc("a.rdc", [frame_capture((1, b"abc")), (NOTES, "renderdoc/ui/notes", b"{}")])
+    b = make_rdc("b.rdc", [frame_capture((1, b"abc"))])
+
+    assert captures_differ(a, b, compare_data=False)
+    diff = diff_captures(a, b)
+    assert len(diff.sections) == 1
+    assert diff.sections[0].index == 1
+    assert diff.sections[0].b is None
+
+
+def test_captures_differ_many(make_rdc):
+    a = make_rdc("a.rdc", [frame_capture((1, b"abc"))])
+    b = make_rdc("b.rdc", [frame_capture((1, b"abd"))])
+
+    assert captures_differ_many([(a, a), (a, b), (b, b)]) == [False, True, False]
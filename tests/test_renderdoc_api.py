@@ -0,0 +1,59 @@
+#  Copyright (c) 2024 Thomas Mathieson.
+#  Distributed under the terms of the MIT license.
+
+import pickle
+from ctypes import CDLL
+
+import pytest
+
+from pyRenderdocApp import (RENDERDOC_API_1_4_0, RENDERDOC_API_1_5_0, RENDERDOC_API_1_6_0, RENDERDOC_Version,
+                            get_render_doc_api, load_render_doc)
+
+
+def test_get_render_doc_api(stub_renderdoc):
+    dll = CDLL(stub_renderdoc)
+    get_api = dll.RENDERDOC_GetAPI
+    requested = []
+
+    def counting_get_api(version, out_api):
+        requested.append(version)
+        return get_api(version, out_api)
+
+    dll.RENDERDOC_GetAPI = counting_get_api
+    api = get_render_doc_api(dll)
+
+    assert isinstance(api, RENDERDOC_API_1_6_0)
+    assert api.version == RENDERDOC_Version.eRENDERDOC_API_Version_1_6_0
+    assert api.get_api_version() == (1, 6, 0)
+    # The table returned while probing is bound directly, rather than being requested again
+    assert requested == [RENDERDOC_Version.eRENDERDOC_API_Version_1_6_0.value]
+
+
+def test_pickle_api(stub_renderdoc):
+    api = get_render_doc_api(CDLL(stub_renderdoc))
+
+    assert pickle.loads(pickle.dumps(api)) is api
+
+
+def test_negotiate_older_version(stub_renderdoc_1_4):
+    api = load_render_doc(stub_renderdoc_1_4)
+
+    assert type(api) is RENDERDOC_API_1_4_0
+    assert api.version == RENDERDOC_Version.eRENDERDOC_API_Version_1_4_2
+    assert api.get_api_version() == (1, 4, 2)
+    # Only the functions available in the negotiated version are exposed
+    assert hasattr(api, "discard_frame_capture")
+    assert not hasattr(api, "show_replay_ui")
+    assert not hasattr(api, "set_capture_title")
+
+
+def test_min_version_not_supported(stub_renderdoc_1_4):
+    dll = CDLL(stub_renderdoc_1_4)
+
+    with pytest.raises(SystemError):
+        get_render_doc_api(dll, RENDERDOC_Version.eRENDERDOC_API_Version_1_5_0)
+    with pytest.raises(SystemError):
+        RENDERDOC_API_1_5_0(dll)
+    # A version older than the wrapper can't provide all of its functions
+    with pytest.raises(ValueError):
+        RENDERDOC_API_1_6_0(dll, RENDERDOC_Version.eRENDERDOC_API_Version_1_4_2)